@@ -1,15 +1,44 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+from services.course_analytics import (
+    get_course_analytics,
+    get_top_courses,
+    get_hardest_courses,
+    append_course_records,
+)
+import pandas as pd
 
 courses_bp = Blueprint("courses", __name__)
 
+DEFAULT_LIMIT = 5
+
 @courses_bp.get("/course-analytics")
 def course_analytics():
-    return jsonify({"courses": []})
+    return jsonify({"courses": get_course_analytics()})
 
 @courses_bp.get("/top-courses")
 def top_courses():
-    return jsonify({"top_courses": []})
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    return jsonify({"top_courses": get_top_courses(limit)})
 
 @courses_bp.get("/hardest-courses")
 def hardest_courses():
-    return jsonify({"hardest_courses": []})
+    limit = request.args.get('limit', DEFAULT_LIMIT, type=int)
+    return jsonify({"hardest_courses": get_hardest_courses(limit)})
+
+@courses_bp.post("/course-records")
+def add_course_records():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    records = data.get('records', [])
+    if not records:
+        return jsonify({"error": "No course records provided"}), 400
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        return jsonify({"error": "records must be a list of objects"}), 400
+
+    try:
+        ingested = append_course_records(pd.DataFrame(records))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"status": "success", "records_ingested": ingested})
@@ -1,6 +1,5 @@
 from flask import Blueprint, jsonify, request
-from services.data_cleaning import load_cleaned_data, apply_filters
-import pandas as pd
+from services.dashboard_views import build_view, build_views, parse_view_options, VIEWS
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
@@ -10,10 +9,6 @@ def dashboard_data():
     Provides all necessary data for the main dashboard view in a single call,
     with optional date filtering.
     """
-    df = load_cleaned_data()
-    if df is None or df.empty:
-        return jsonify({"error": "No data available"}), 500
-
     # Extract filters from request arguments
     filters = {
         'gender': request.args.get('gender'),
@@ -22,48 +17,35 @@ def dashboard_data():
         'lunch': request.args.get('lunch'),
         'race_ethnicity': request.args.get('race_ethnicity')
     }
-    
-    # Apply filters
-    df = apply_filters(df, filters)
-
-    if df.empty:
-        return jsonify({"stats": {"totalStudents": 0, "completionRate": 0, "averageScore": 0, "dropoutRate": 0, "activeStudents": 0}, "studentData": []})
-
-    total_students = len(df)
-    
-    score_cols = ['math_score', 'reading_score', 'writing_score']
-    existing_score_cols = [col for col in score_cols if col in df.columns]
-    
-    if not existing_score_cols:
-        # If no score data after filtering, return appropriate error or empty stats
-        return jsonify({"stats": {"totalStudents": 0, "completionRate": 0, "averageScore": 0, "dropoutRate": 0, "activeStudents": 0}, "studentData": []})
 
-    df['overall_score'] = df[existing_score_cols].mean(axis=1)
-    
-    # Completion rate (overall_score >= 60)
-    completed_students = df[df['overall_score'] >= 60]
-    completion_rate = (len(completed_students) / total_students) * 100 if total_students > 0 else 0
+    payload, status = build_view('dashboard', filters, parse_view_options({}))
+    return jsonify(payload), status
 
-    # Average score
-    average_score = df['overall_score'].mean() if not df.empty else 0
+@dashboard_bp.get("/dashboard-views")
+def dashboard_views():
+    """
+    Computes several dashboard panels (?views=dashboard,scores,trends,dropouts)
+    from one filtered selection, sharing the filtering, overall_score, score
+    bands and category codes between them. Accepts the filters and options of
+    the individual endpoints (bin_width, exact, granularity, window, dimensions).
+    """
+    views = [v.strip() for v in request.args.get('views', ','.join(VIEWS)).split(',') if v.strip()]
+    unknown = [v for v in views if v not in VIEWS]
+    if not views or unknown:
+        return jsonify({"error": f"Unknown view(s): {', '.join(unknown)}. Allowed: {', '.join(VIEWS)}"}), 400
 
-    # Dropout rate (overall_score < 40)
-    dropout_students = df[df['overall_score'] < 40]
-    dropout_rate = (len(dropout_students) / total_students) * 100 if total_students > 0 else 0
+    filters = {
+        'gender': request.args.get('gender'),
+        'parental_level_of_education': request.args.get('parental_level_of_education'),
+        'test_preparation_course': request.args.get('test_preparation_course'),
+        'lunch': request.args.get('lunch'),
+        'race_ethnicity': request.args.get('race_ethnicity')
+    }
 
-    # Active students (students with overall_score >= 40 and < 60)
-    active_students = df[(df['overall_score'] >= 40) & (df['overall_score'] < 60)].shape[0]
-    
-    # Convert dataframe to list of dictionaries for JSON serialization
-    student_data_list = df.to_dict(orient='records')
+    try:
+        options = parse_view_options(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    return jsonify({
-        "stats": {
-            "totalStudents": total_students,
-            "completionRate": round(completion_rate, 1),
-            "averageScore": round(average_score, 1),
-            "dropoutRate": round(dropout_rate, 1),
-            "activeStudents": active_students,
-        },
-        "studentData": student_data_list
-    })
+    payload, status = build_views(list(dict.fromkeys(views)), filters, options)
+    return jsonify(payload), status
@@ -1,5 +1,5 @@
 from flask import Blueprint, jsonify
-from services.data_cleaning import load_cleaned_data
+from services.data_cleaning import load_cleaned_data, SCORE_COLUMNS, COMPLETION_THRESHOLD, DROPOUT_THRESHOLD
 
 metrics_bp = Blueprint("metrics", __name__)
 
@@ -12,7 +12,7 @@ def average_score():
     if df is None or df.empty:
         return jsonify({"average_score": 0})
 
-    score_cols = ["math_score", "reading_score", "writing_score"]
+    score_cols = SCORE_COLUMNS
     existing_cols = [c for c in score_cols if c in df.columns]
 
     if not existing_cols:
@@ -32,7 +32,7 @@ def completion_rate():
     if df is None or df.empty:
         return jsonify({"completion_rate": 0})
 
-    score_cols = ["math_score", "reading_score", "writing_score"]
+    score_cols = SCORE_COLUMNS
     existing_cols = [c for c in score_cols if c in df.columns]
 
     if not existing_cols:
@@ -40,8 +40,8 @@ def completion_rate():
 
     df["overall_score"] = df[existing_cols].mean(axis=1)
 
-    # Students who scored >= 60 are “completed”
-    completed = df[df["overall_score"] >= 60]
+    # Students who scored >= COMPLETION_THRESHOLD are “completed”
+    completed = df[df["overall_score"] >= COMPLETION_THRESHOLD]
     rate = (len(completed) / len(df)) * 100
 
     return jsonify({"completion_rate": round(rate, 2)})
@@ -56,7 +56,7 @@ def dropout_rate():
     if df is None or df.empty:
         return jsonify({"dropout_rate": 0})
 
-    score_cols = ["math_score", "reading_score", "writing_score"]
+    score_cols = SCORE_COLUMNS
     existing_cols = [c for c in score_cols if c in df.columns]
 
     if not existing_cols:
@@ -64,8 +64,8 @@ def dropout_rate():
 
     df["overall_score"] = df[existing_cols].mean(axis=1)
 
-    # Students scoring < 40 = “dropout”
-    dropout = df[df["overall_score"] < 40]
+    # Students scoring < DROPOUT_THRESHOLD = “dropout”
+    dropout = df[df["overall_score"] < DROPOUT_THRESHOLD]
     rate = (len(dropout) / len(df)) * 100
 
     return jsonify({"dropout_rate": round(rate, 2)})
@@ -89,7 +89,7 @@ def active_students():
     if df is None or df.empty:
         return jsonify({"active_students": 0})
 
-    score_cols = ["math_score", "reading_score", "writing_score"]
+    score_cols = SCORE_COLUMNS
     existing_cols = [c for c in score_cols if c in df.columns]
 
     if not existing_cols:
@@ -98,6 +98,6 @@ def active_students():
     df["overall_score"] = df[existing_cols].mean(axis=1)
 
     # Active = in the middle range (between dropout and completion)
-    active = df[(df["overall_score"] >= 40) & (df["overall_score"] < 60)]
+    active = df[(df["overall_score"] >= DROPOUT_THRESHOLD) & (df["overall_score"] < COMPLETION_THRESHOLD)]
     
     return jsonify({"active_students": len(active)})
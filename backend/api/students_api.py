@@ -1,17 +1,29 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+from services.student_profiles import get_student_profile, get_student_profiles
 
 students_bp = Blueprint("students", __name__)
 
+MAX_BULK_PROFILES = 500
+
 @students_bp.get("/student/<student_id>/profile")
 def student_profile(student_id):
-    return jsonify({
-        "student_id": student_id,
-        "name": "",
-        "average_score": 0,
-        "hours_watched": 0,
-        "progress": 0,
-        "score_history": [],
-        "activity_history": [],
-        "last_active": "",
-        "courses_enrolled": []
-    })
+    profile = get_student_profile(student_id)
+    if profile is None:
+        return jsonify({"error": f"Student '{student_id}' not found"}), 404
+    return jsonify(profile)
+
+@students_bp.post("/students/profiles")
+def student_profiles():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    student_ids = data.get('student_ids', [])
+    if not isinstance(student_ids, list) or not student_ids:
+        return jsonify({"error": "No student_ids provided"}), 400
+    if not all(isinstance(student_id, str) for student_id in student_ids):
+        return jsonify({"error": "student_ids must be strings"}), 400
+    if len(student_ids) > MAX_BULK_PROFILES:
+        return jsonify({"error": f"At most {MAX_BULK_PROFILES} student_ids per request"}), 400
+
+    profiles, not_found = get_student_profiles(student_ids)
+    return jsonify({"profiles": profiles, "not_found": not_found})
@@ -1,15 +1,13 @@
 from flask import Blueprint, jsonify, request
-from services.data_cleaning import load_cleaned_data, apply_filters
+from services.data_cleaning import normalize_filters
+from services.trend_series import get_time_series, get_cohort_curves
+from services.dashboard_views import build_view, parse_view_options
 import pandas as pd
 
 trends_bp = Blueprint("trends", __name__)
 
 @trends_bp.get("/trends-data")
 def trends_data():
-    df = load_cleaned_data()
-    if df is None or df.empty:
-        return jsonify({"error": "No data available"}), 500
-
     # Extract filters from request arguments
     filters = {
         'gender': request.args.get('gender'),
@@ -18,32 +16,77 @@ def trends_data():
         'lunch': request.args.get('lunch'),
         'race_ethnicity': request.args.get('race_ethnicity')
     }
-    
-    # Apply filters
-    df = apply_filters(df, filters)
-
-    if df.empty:
-        return jsonify({"completionTrend": [], "averageScoresBySubject": []})
-
-    score_cols = ['math_score', 'reading_score', 'writing_score']
-    existing_score_cols = [col for col in score_cols if col in df.columns]
-    
-    if not existing_score_cols:
-        return jsonify({"error": "No score data available"}), 500
-
-    df['overall_score'] = df[existing_score_cols].mean(axis=1)
-
-    # Learning Completion Trend (using parental level of education as a proxy for trend)
-    completion_by_education = df.groupby('parental_level_of_education')['overall_score'].apply(
-        lambda x: (x >= 60).sum() / len(x) * 100 if len(x) > 0 else 0
-    ).reset_index()
-    completion_by_education = completion_by_education.rename(columns={'overall_score': 'completion_rate'})
-    
-    # Average Scores (per subject)
-    average_scores_by_subject = df[existing_score_cols].mean().reset_index()
-    average_scores_by_subject = average_scores_by_subject.rename(columns={'index': 'subject', 0: 'average_score'})
 
+    try:
+        options = parse_view_options(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    payload, status = build_view('trends', filters, options)
+    return jsonify(payload), status
+
+
+def _trend_filters():
+    """
+    The request's filters in canonical form (matched case-insensitively to the
+    cleaned data). Raises ValueError for unknown columns or values.
+    """
+    return normalize_filters({
+        'gender': request.args.get('gender'),
+        'parental_level_of_education': request.args.get('parental_level_of_education'),
+        'test_preparation_course': request.args.get('test_preparation_course'),
+        'lunch': request.args.get('lunch'),
+        'race_ethnicity': request.args.get('race_ethnicity')
+    })
+
+@trends_bp.get("/score-trend")
+def score_trend():
+    try:
+        filters = _trend_filters()
+        options = parse_view_options(request.args, default_window=7)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    series = get_time_series(filters, granularity="day", window=options['window'])
     return jsonify({
-        "completionTrend": completion_by_education.to_dict(orient='records'),
-        "averageScoresBySubject": average_scores_by_subject.to_dict(orient='records')
-    })
\ No newline at end of file
+        "dates": [point["period"] for point in series],
+        "scores": [point["average_score"] for point in series],
+        "rolling_scores": [point["rolling_average_score"] for point in series]
+    })
+
+@trends_bp.get("/activity-trend")
+def activity_trend():
+    try:
+        filters = _trend_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    series = get_time_series(filters, granularity="day")
+    return jsonify({
+        "dates": [point["period"] for point in series],
+        "activity": [point["events"] for point in series],
+        "active_students": [point["active_students"] for point in series]
+    })
+
+@trends_bp.get("/weekly-progress")
+def weekly_progress():
+    try:
+        filters = _trend_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    series = get_time_series(filters, granularity="week")
+    return jsonify({
+        "weeks": [pd.Timestamp(point["period"]).strftime("%G-W%V") for point in series],
+        "average_scores": [point["average_score"] for point in series],
+        "completion_rates": [point["completion_rate"] for point in series]
+    })
+
+@trends_bp.get("/cohort-curves")
+def cohort_curves():
+    try:
+        filters = _trend_filters()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"cohorts": get_cohort_curves(filters)})
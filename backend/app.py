@@ -16,7 +16,8 @@ from api.dropouts_api import dropouts_bp
 import services.prediction_model # Import the module
 
 app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}})
+# ETag is exposed so the frontend can revalidate the prediction grid
+CORS(app, resources={r"/api/*": {"origins": "http://localhost:5173"}}, expose_headers=["ETag"])
 
 @app.get("/api/health")
 def health():
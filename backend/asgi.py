@@ -0,0 +1,219 @@
+"""
+Async serving mode.
+
+    uvicorn asgi:app --port 5000
+
+The slow, I/O-bound endpoints (/api/ai-summary waits on Gemini, /api/refresh-data
+on Kaggle) are served here as coroutines, so one process can keep many of them
+in flight. Their pandas work runs on a bounded thread pool. Every other route is
+handed to the regular Flask app through a small WSGI bridge that runs it on a
+pool of WSGI_WORKERS threads, so analytics requests are served concurrently, as
+under `python app.py`.
+
+For offline runs set AI_SUMMARY_BACKEND=stub and KAGGLE_BACKEND=stub
+(latency via AI_STUB_LATENCY / KAGGLE_STUB_LATENCY).
+"""
+import asyncio
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+from app import app as flask_app
+from services.ai_summary import build_summary_inputs, generate_ai_summary_async
+from services.data_refresh import refresh_dataset_async, refresh_status
+
+# Bounded pools: CPU-bound pandas work, and blocking downloads kept apart so a
+# slow refresh cannot take the workers the summaries need.
+CPU_WORKERS = int(os.getenv("ASYNC_CPU_WORKERS", str(os.cpu_count() or 4)))
+IO_WORKERS = int(os.getenv("ASYNC_IO_WORKERS", "2"))
+WSGI_WORKERS = int(os.getenv("ASYNC_WSGI_WORKERS", str(min(32, (os.cpu_count() or 4) + 4))))
+
+# Same origin Flask-CORS allows in app.py
+ALLOWED_ORIGIN = "http://localhost:5173"
+
+FILTER_KEYS = ['gender', 'parental_level_of_education', 'test_preparation_course', 'lunch', 'race_ethnicity']
+
+_cpu_pool = ThreadPoolExecutor(max_workers=CPU_WORKERS, thread_name_prefix="asgi-cpu")
+_io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="asgi-io")
+_wsgi_pool = ThreadPoolExecutor(max_workers=WSGI_WORKERS, thread_name_prefix="asgi-wsgi")
+_refresh_lock = None
+
+
+# -----------------------------
+# WSGI bridge
+# -----------------------------
+# Each Flask request runs on _wsgi_pool; response chunks are handed back to the
+# event loop as they are produced. Only the ASGI and WSGI specs are relied on.
+
+def _build_environ(scope, body):
+    """WSGI environ for an ASGI HTTP scope (PEP 3333 strings are latin-1)."""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf8").decode("latin1"),
+        "PATH_INFO": scope["path"].encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1] or 80),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"], environ["REMOTE_PORT"] = scope["client"][0], str(scope["client"][1])
+
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin1").lower()
+        if name == "content-length":
+            key = "CONTENT_LENGTH"
+        elif name == "content-type":
+            key = "CONTENT_TYPE"
+        else:
+            key = "HTTP_" + name.upper().replace("-", "_")
+        value = value.decode("latin1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def _run_wsgi(environ, send, loop):
+    """Runs the Flask app in a worker thread, sending the response through the loop."""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        if exc_info and response.get("started"):
+            raise exc_info[1].with_traceback(exc_info[2])
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = [(name.lower().encode("latin1"), value.encode("latin1")) for name, value in headers]
+
+    def send_sync(message):
+        asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+    def send_start():
+        send_sync({"type": "http.response.start", "status": response["status"], "headers": response["headers"]})
+        response["started"] = True
+
+    body = flask_app(environ, start_response)
+    try:
+        for chunk in body:
+            if not chunk:
+                continue
+            if not response.get("started"):
+                send_start()
+            send_sync({"type": "http.response.body", "body": chunk, "more_body": True})
+        if not response.get("started"):
+            send_start()
+        send_sync({"type": "http.response.body", "body": b""})
+    finally:
+        if hasattr(body, "close"):
+            body.close()
+
+
+async def wsgi_app(scope, receive, send):
+    if scope["type"] != "http":
+        raise ValueError(f"Unsupported ASGI scope type for the Flask app: {scope['type']}")
+    body = await _read_body(receive)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_wsgi_pool, _run_wsgi, _build_environ(scope, body), send, loop)
+
+
+async def _read_body(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def _send_json(send, status, payload, origin):
+    body = json.dumps(payload).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    if origin == ALLOWED_ORIGIN:
+        headers.append((b"access-control-allow-origin", origin.encode()))
+        headers.append((b"vary", b"Origin"))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+# -----------------------------
+# Async endpoints
+# -----------------------------
+
+async def ai_summary(scope, receive):
+    try:
+        data = json.loads(await _read_body(receive) or b"{}")
+    except ValueError:
+        return 400, {"error": "Invalid JSON body"}
+
+    student_data_list = data.get('studentData', []) if isinstance(data, dict) else []
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+    filters = {key: query.get(key, [None])[0] for key in FILTER_KEYS}
+
+    loop = asyncio.get_running_loop()
+    try:
+        metrics, trend = await loop.run_in_executor(_cpu_pool, build_summary_inputs, student_data_list, filters)
+    except ValueError as e:
+        return 400, {"error": str(e)}
+
+    summary = await generate_ai_summary_async(metrics, trend)
+
+    return 200, {
+        "summary": summary,
+        "metrics_used": metrics,
+        "trend_used": trend
+    }
+
+
+async def refresh_data(scope, receive):
+    global _refresh_lock
+    await _read_body(receive)
+
+    # One refresh at a time; concurrent callers wait for the running one
+    if _refresh_lock is None:
+        _refresh_lock = asyncio.Lock()
+    async with _refresh_lock:
+        result = await refresh_dataset_async(_io_pool, _cpu_pool)
+        return refresh_status(result), result
+
+
+ASYNC_ROUTES = {
+    ("POST", "/api/ai-summary"): ai_summary,
+    ("POST", "/api/refresh-data"): refresh_data,
+}
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                _cpu_pool.shutdown(wait=False)
+                _io_pool.shutdown(wait=False)
+                _wsgi_pool.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    if scope["type"] == "http":
+        handler = ASYNC_ROUTES.get((scope["method"], scope["path"]))
+        if handler is not None:
+            origin = dict(scope.get("headers", [])).get(b"origin", b"").decode()
+            try:
+                status, payload = await handler(scope, receive)
+            except Exception as e:
+                print("Error in async endpoint:", e)
+                status, payload = 500, {"error": "Internal server error"}
+            await _send_json(send, status, payload, origin)
+            return
+
+    await wsgi_app(scope, receive, send)
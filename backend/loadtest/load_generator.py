@@ -0,0 +1,162 @@
+"""
+Open-loop load generator for the backend.
+
+    python -m loadtest.load_generator --scenario mixed --rps 20 --duration 60
+
+Requests are started on a fixed schedule (Poisson arrivals at --rps) whatever
+the backend's response times, so a slow backend shows up as growing latency
+instead of a lower request rate. Latency is measured from each request's
+scheduled start, which includes time spent waiting for a free worker.
+Prints latency percentiles and error rates per request type; --json also
+writes the report to a file.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from loadtest.scenarios import SCENARIOS
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def send_request(base_url, method, path, body, timeout):
+    """Returns (HTTP status or None, parsed JSON or None, error label or None)."""
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, method=method)
+    if data is not None:
+        request.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            status, raw = response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, None, f"http_{e.code}"
+    except Exception as e:
+        return None, None, type(e).__name__
+
+    try:
+        return status, json.loads(raw), None
+    except ValueError:
+        return status, None, "invalid_json"
+
+
+def load_context(base_url, timeout):
+    """Data shared by the request builders: the unfiltered dashboard rows."""
+    status, payload, error = send_request(base_url, "GET", "/api/dashboard-data", None, timeout)
+    if error:
+        print(f"Warning: could not fetch student data for summary bodies ({error})")
+        return {"student_data": []}
+    return {"student_data": payload.get("studentData", [])}
+
+
+def _percentile(sorted_values, p):
+    # Nearest-rank percentile
+    if not sorted_values:
+        return None
+    rank = max(int(-(-p * len(sorted_values) // 100)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(results, elapsed):
+    """Builds the report from (name, latency seconds, status, error) tuples."""
+    groups = defaultdict(list)
+    for result in results:
+        groups[result[0]].append(result)
+        groups["TOTAL"].append(result)
+
+    report = {}
+    for name, rows in groups.items():
+        latencies = sorted(latency * 1000 for _, latency, _, _ in rows)
+        errors = Counter(error for _, _, _, error in rows if error)
+        stats = {
+            "requests": len(rows),
+            "rps": round(len(rows) / elapsed, 2) if elapsed else None,
+            "errors": sum(errors.values()),
+            "error_rate": round(sum(errors.values()) / len(rows) * 100, 2),
+            "error_types": dict(errors),
+            "statuses": dict(Counter(str(status) for _, _, status, _ in rows)),
+            "mean_ms": round(sum(latencies) / len(latencies), 1),
+            "max_ms": round(latencies[-1], 1),
+        }
+        for p in PERCENTILES:
+            stats[f"p{p}_ms"] = round(_percentile(latencies, p), 1)
+        report[name] = stats
+    return report
+
+
+def run_scenario(base_url, scenario, rps, duration, workers=64, timeout=60.0, seed=None):
+    """
+    Replays the scenario's request mix at `rps` for `duration` seconds.
+    Returns (results, elapsed seconds).
+    """
+    rng = random.Random(seed)
+    weights = [weight for weight, _ in scenario]
+    specs = [spec for _, spec in scenario]
+    context = load_context(base_url, timeout)
+
+    results = []
+    results_lock = threading.Lock()
+
+    def execute(spec, method, path, body, scheduled):
+        status, payload, error = send_request(base_url, method, path, body, timeout)
+        if error is None and spec.check and isinstance(payload, dict):
+            error = spec.check(payload)
+        latency = time.perf_counter() - scheduled
+        with results_lock:
+            results.append((spec.name, latency, status, error))
+
+    started = time.perf_counter()
+    next_start = started
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while next_start - started < duration:
+            pause = next_start - time.perf_counter()
+            if pause > 0:
+                time.sleep(pause)
+            spec = rng.choices(specs, weights)[0]
+            method, path, body = spec.build(rng, context)
+            pool.submit(execute, spec, method, path, body, next_start)
+            next_start += rng.expovariate(rps)
+        elapsed = time.perf_counter() - started  # load phase only; in-flight requests still finish
+    return results, elapsed
+
+
+def print_report(report):
+    columns = ["requests", "rps", "error_rate", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms"]
+    print(f"{'request':<18}" + "".join(f"{c:>12}" for c in columns))
+    for name in sorted(report, key=lambda n: (n == "TOTAL", n)):
+        stats = report[name]
+        print(f"{name:<18}" + "".join(f"{str(stats[c]):>12}" for c in columns))
+        if stats["error_types"]:
+            print(f"{'':<18}errors: {stats['error_types']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a traffic mix against the backend and report latencies.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--rps", type=float, default=10.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load")
+    parser.add_argument("--workers", type=int, default=64, help="Maximum requests in flight")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    print(f"Running scenario '{args.scenario}' at {args.rps} rps for {args.duration}s against {args.base_url}")
+    results, elapsed = run_scenario(
+        args.base_url, SCENARIOS[args.scenario], args.rps, args.duration,
+        workers=args.workers, timeout=args.timeout, seed=args.seed,
+    )
+    if not results:
+        print("No requests completed.")
+    else:
+        report = summarize(results, elapsed)
+        print_report(report)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"scenario": args.scenario, "target_rps": args.rps, "duration": args.duration, "report": report}, f, indent=2)
@@ -0,0 +1,102 @@
+"""
+Request mixes replayed by loadtest/load_generator.py.
+
+A scenario is a list of (weight, RequestSpec). Each spec builds a request from
+a random generator and a shared context (e.g. student rows fetched once, for
+/ai-summary bodies shaped like the frontend's), and may check the response.
+"""
+from urllib.parse import urlencode
+
+FILTER_VALUES = {
+    'gender': ['female', 'male'],
+    'race_ethnicity': ['group A', 'group B', 'group C', 'group D', 'group E'],
+    'parental_level_of_education': [
+        "associate's degree", "bachelor's degree", 'high school',
+        "master's degree", 'some college', 'some high school',
+    ],
+    'lunch': ['free/reduced', 'standard'],
+    'test_preparation_course': ['completed', 'none'],
+}
+
+UNFILTERED_SHARE = 0.5  # share of dashboard requests without filters (first page load)
+
+
+class RequestSpec:
+    def __init__(self, name, method, path, query=None, body=None, check=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.query = query    # rng -> dict of query params
+        self.body = body      # (rng, context) -> JSON body
+        self.check = check    # parsed JSON -> error label or None
+
+    def build(self, rng, context):
+        """Returns (method, path with query string, JSON body or None)."""
+        path = self.path
+        params = self.query(rng) if self.query else {}
+        if params:
+            path += "?" + urlencode(params)
+        body = self.body(rng, context) if self.body else None
+        return self.method, path, body
+
+
+def random_filters(rng):
+    """Most page loads are unfiltered; the rest pick one or two filters with one or two values."""
+    if rng.random() < UNFILTERED_SHARE:
+        return {}
+    filters = {}
+    for column in rng.sample(sorted(FILTER_VALUES), rng.choice([1, 1, 2])):
+        values = FILTER_VALUES[column]
+        filters[column] = ",".join(rng.sample(values, min(len(values), rng.choice([1, 1, 2]))))
+    return filters
+
+
+def _views_query(rng):
+    return {"views": "dashboard,scores,trends,dropouts", **random_filters(rng)}
+
+
+def _predict_body(rng, context):
+    return {
+        "hours_watched": rng.randint(0, 40),
+        "average_score": round(rng.uniform(20, 100), 1),
+        "activity_level": rng.randint(0, 7),
+    }
+
+
+def _summary_body(rng, context):
+    # The frontend posts the rows of the current dashboard selection
+    return {"studentData": context.get("student_data", [])}
+
+
+def _summary_check(payload):
+    if str(payload.get("summary", "")).startswith("[Gemini Error"):
+        return "upstream_error"
+    return None
+
+
+DASHBOARD_VIEWS = RequestSpec("dashboard-views", "GET", "/api/dashboard-views", query=_views_query)
+DASHBOARD_DATA = RequestSpec("dashboard-data", "GET", "/api/dashboard-data", query=random_filters)
+SCORES_DATA = RequestSpec("scores-data", "GET", "/api/scores-data", query=random_filters)
+TRENDS_DATA = RequestSpec("trends-data", "GET", "/api/trends-data", query=random_filters)
+DROPOUTS_DATA = RequestSpec("dropouts-data", "GET", "/api/dropouts-data", query=random_filters)
+PREDICT = RequestSpec("predict", "POST", "/api/predict", body=_predict_body)
+PREDICT_GRID = RequestSpec("predict-grid", "GET", "/api/predict-grid")
+AI_SUMMARY = RequestSpec("ai-summary", "POST", "/api/ai-summary", query=random_filters, body=_summary_body, check=_summary_check)
+REFRESH = RequestSpec("refresh-data", "POST", "/api/refresh-data", body=lambda rng, context: {})
+
+SCENARIOS = {
+    # Analysts browsing the dashboard pages
+    "dashboard": [
+        (50, DASHBOARD_VIEWS), (20, DASHBOARD_DATA), (10, SCORES_DATA), (10, TRENDS_DATA), (10, DROPOUTS_DATA),
+    ],
+    # The predictor page: grid download, plus clients still posting /predict
+    "predictor": [(80, PREDICT), (20, PREDICT_GRID)],
+    # Summaries only, to size the Gemini-bound path
+    "summary": [(100, AI_SUMMARY)],
+    # Refreshes only (run at a low rate)
+    "refresh": [(100, REFRESH)],
+    # A day of mixed traffic: every dashboard load asks for a summary, refreshes are rare
+    "mixed": [
+        (45, DASHBOARD_VIEWS), (10, DASHBOARD_DATA), (20, PREDICT), (3, PREDICT_GRID), (20, AI_SUMMARY), (2, REFRESH),
+    ],
+}
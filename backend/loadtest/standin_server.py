@@ -0,0 +1,188 @@
+"""
+Local stand-in for the Gemini and Kaggle APIs, used for load tests.
+
+    python -m loadtest.standin_server --latency 2 --jitter 0.5 --failure-rate 0.05
+
+Point the backend at it with AI_SUMMARY_BACKEND=local and KAGGLE_BACKEND=local
+(AI_LOCAL_URL / KAGGLE_LOCAL_URL default to http://127.0.0.1:8090).
+
+    POST /v1/generate                        {"prompt": ..., "stream": bool} -> {"text": ...}
+                                             or, streamed, one JSON chunk per line
+    GET  /datasets/<owner>/<name>/download   zip of the raw dataset CSV
+    GET  /stats                              request, failure and latency counters
+"""
+import argparse
+import io
+import json
+import os
+import random
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RAW_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'raw')
+DEFAULT_DATASET_FILE = os.path.join(RAW_DATA_DIR, 'StudentsPerformance.csv')
+
+GENERATE_TEXT = (
+    "Quick Overview:\n"
+    "Performance is stable with most students above the completion threshold.\n\n"
+    "Dropout Risks:\n"
+    "Students below 40 need targeted support.\n\n"
+    "Recommendations:\n"
+    "Encourage test preparation and monitor weekly scores.\n"
+)
+
+
+class StandInConfig:
+    def __init__(self, latency=1.0, jitter=0.0, failure_rate=0.0, stream_chunks=8,
+                 download_latency=None, dataset_file=DEFAULT_DATASET_FILE, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.stream_chunks = max(int(stream_chunks), 1)
+        self.download_latency = latency if download_latency is None else download_latency
+        self.dataset_file = dataset_file
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+
+        self.stats_lock = threading.Lock()
+        self.stats = {"generate": 0, "generate_streamed": 0, "download": 0, "failures": 0}
+
+        self._archive = None
+
+    def delay(self, base):
+        with self.random_lock:
+            return max(0.0, base + self.random.uniform(-self.jitter, self.jitter))
+
+    def should_fail(self):
+        with self.random_lock:
+            return self.random.random() < self.failure_rate
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def archive(self):
+        """The dataset zipped once in memory, as Kaggle serves it."""
+        if self._archive is None:
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+                zf.write(self.dataset_file, os.path.basename(self.dataset_file))
+            self._archive = buffer.getvalue()
+        return self._archive
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None  # set by make_server
+
+    def log_message(self, format, *args):
+        pass  # keep the console quiet under load
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _fail(self):
+        self.config.count("failures")
+        self._send_json(503, {"error": "Injected upstream failure"})
+
+    def _send_chunked(self, chunks, content_type, total_delay):
+        """Sends chunks with the delay spread across them (time to first byte included)."""
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pause = total_delay / len(chunks) if chunks else 0
+        for chunk in chunks:
+            time.sleep(pause)
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_POST(self):
+        if self.path != "/v1/generate":
+            return self._send_json(404, {"error": "Not found"})
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, {"error": "Invalid JSON body"})
+
+        delay = self.config.delay(self.config.latency)
+        if self.config.should_fail():
+            time.sleep(delay)
+            return self._fail()
+
+        text = f"[Local stand-in, prompt of {len(request.get('prompt', ''))} chars]\n\n" + GENERATE_TEXT
+        if request.get("stream"):
+            self.config.count("generate_streamed")
+            size = -(-len(text) // self.config.stream_chunks)
+            chunks = [
+                (json.dumps({"text": text[i:i + size]}) + "\n").encode()
+                for i in range(0, len(text), size)
+            ]
+            return self._send_chunked(chunks, "application/x-ndjson", delay)
+
+        self.config.count("generate")
+        time.sleep(delay)
+        self._send_json(200, {"text": text})
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.config.stats_lock:
+                return self._send_json(200, dict(self.config.stats))
+
+        parts = self.path.strip("/").split("/")
+        if len(parts) != 4 or parts[0] != "datasets" or parts[3] != "download":
+            return self._send_json(404, {"error": "Not found"})
+
+        delay = self.config.delay(self.config.download_latency)
+        if self.config.should_fail():
+            time.sleep(delay)
+            return self._fail()
+
+        self.config.count("download")
+        archive = self.config.archive()
+        size = -(-len(archive) // self.config.stream_chunks)
+        chunks = [archive[i:i + size] for i in range(0, len(archive), size)]
+        self._send_chunked(chunks, "application/zip", delay)
+
+
+def make_server(config, host="127.0.0.1", port=8090):
+    handler = type("ConfiguredStandInHandler", (StandInHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Gemini/Kaggle stand-in for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=1.0, help="Seconds per generate call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- seconds added to each latency")
+    parser.add_argument("--download-latency", type=float, default=None, help="Seconds per dataset download (default: --latency)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--stream-chunks", type=int, default=8, help="Chunks per streamed response or download")
+    parser.add_argument("--dataset-file", default=DEFAULT_DATASET_FILE)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StandInConfig(
+        latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate,
+        stream_chunks=args.stream_chunks, download_latency=args.download_latency,
+        dataset_file=args.dataset_file, seed=args.seed,
+    )
+    server = make_server(config, args.host, args.port)
+    print(f"Stand-in server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
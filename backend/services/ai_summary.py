@@ -1,6 +1,17 @@
 import os
+import json
+import time
+import asyncio
+import urllib.request
+import pandas as pd
 import google.generativeai as genai
 
+from services.data_cleaning import (
+    apply_filters, normalize_filters, select_rows,
+    SCORE_COLUMNS, COMPLETION_THRESHOLD, DROPOUT_THRESHOLD,
+)
+from services.trend_series import get_time_series
+
 # -----------------------------
 # 1. Gemini API key handling
 # -----------------------------
@@ -22,6 +33,17 @@ if not API_KEY:
 if API_KEY:
     genai.configure(api_key=API_KEY)
 
+# AI_SUMMARY_BACKEND=stub swaps Gemini for a local stand-in that answers after
+# AI_STUB_LATENCY seconds, so the summary endpoints can be exercised offline.
+# AI_SUMMARY_BACKEND=local sends the prompt over HTTP to the stand-in server in
+# loadtest/standin_server.py instead (configurable latency, failures, streaming).
+AI_SUMMARY_BACKEND = os.getenv("AI_SUMMARY_BACKEND", "gemini")
+AI_STUB_LATENCY = float(os.getenv("AI_STUB_LATENCY", "0"))
+AI_LOCAL_URL = os.getenv("AI_LOCAL_URL", "http://127.0.0.1:8090")
+AI_LOCAL_STREAM = os.getenv("AI_LOCAL_STREAM", "false").lower() == "true"
+AI_LOCAL_TIMEOUT = float(os.getenv("AI_LOCAL_TIMEOUT", "60"))
+GEMINI_MODEL = "models/gemini-2.5-pro"
+
 
 # -----------------------------
 # 2. Build AI prompt
@@ -55,12 +77,40 @@ Use clear, professional language.
 # 3. Main AI summary function
 # -----------------------------
 
+def generate_local_content(prompt):
+    """
+    Sends the prompt to the local stand-in server (AI_SUMMARY_BACKEND=local).
+    With AI_LOCAL_STREAM the reply arrives as newline-delimited JSON chunks,
+    like a streamed Gemini response. Raises on HTTP or connection errors.
+    """
+    request = urllib.request.Request(
+        f"{AI_LOCAL_URL}/v1/generate",
+        data=json.dumps({"prompt": prompt, "stream": AI_LOCAL_STREAM}).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=AI_LOCAL_TIMEOUT) as response:
+        if not AI_LOCAL_STREAM:
+            return json.loads(response.read())["text"].strip()
+        return "".join(json.loads(line)["text"] for line in response if line.strip()).strip()
+
+
 def generate_ai_summary(metrics, trend):
     """
     Uses Gemini 2.5 Pro for real AI analysis.
     Falls back to placeholder summary if API fails.
     """
 
+    if AI_SUMMARY_BACKEND == "stub":
+        time.sleep(AI_STUB_LATENCY)
+        return stub_summary(metrics, trend)
+
+    if AI_SUMMARY_BACKEND == "local":
+        try:
+            return generate_local_content(build_prompt(metrics, trend))
+        except Exception as e:
+            return f"[Gemini Error: {str(e)}]\n\n" + fallback_summary(metrics, trend)
+
     # If API key missing → fallback
     if not API_KEY:
         return fallback_summary(metrics, trend)
@@ -69,7 +119,7 @@ def generate_ai_summary(metrics, trend):
         prompt = build_prompt(metrics, trend)
 
         # Correct model name from your list
-        model = genai.GenerativeModel("models/gemini-2.5-pro")
+        model = genai.GenerativeModel(GEMINI_MODEL)
 
         response = model.generate_content(prompt)
 
@@ -80,6 +130,37 @@ def generate_ai_summary(metrics, trend):
         return f"[Gemini Error: {str(e)}]\n\n" + fallback_summary(metrics, trend)
 
 
+async def generate_ai_summary_async(metrics, trend):
+    """
+    Coroutine version of generate_ai_summary for the ASGI app: the Gemini call
+    is awaited, so the event loop keeps serving while it is in flight.
+    """
+
+    if AI_SUMMARY_BACKEND == "stub":
+        await asyncio.sleep(AI_STUB_LATENCY)
+        return stub_summary(metrics, trend)
+
+    if AI_SUMMARY_BACKEND == "local":
+        # urllib is blocking, so the request waits on the default executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, generate_local_content, build_prompt(metrics, trend))
+        except Exception as e:
+            return f"[Gemini Error: {str(e)}]\n\n" + fallback_summary(metrics, trend)
+
+    if not API_KEY:
+        return fallback_summary(metrics, trend)
+
+    try:
+        prompt = build_prompt(metrics, trend)
+        model = genai.GenerativeModel(GEMINI_MODEL)
+        response = await model.generate_content_async(prompt)
+        return response.text.strip()
+
+    except Exception as e:
+        return f"[Gemini Error: {str(e)}]\n\n" + fallback_summary(metrics, trend)
+
+
 # -----------------------------
 # 4. Fallback summary
 # -----------------------------
@@ -109,3 +190,71 @@ Weekly scores: {week_scores}
 
 (This is a fallback summary. Gemini will give richer insights when API is active.)
 """.strip()
+
+
+def stub_summary(metrics, trend):
+    """Deterministic stand-in for a Gemini response (AI_SUMMARY_BACKEND=stub)."""
+    return "[Stub AI summary]\n\n" + fallback_summary(metrics, trend)
+
+
+# -----------------------------
+# 5. Prompt inputs from student data
+# -----------------------------
+
+def build_summary_inputs(student_data_list, filters):
+    """
+    Computes the metrics and weekly trend that feed the prompt. Without
+    student_data_list the rows come from the shared (memoized) selection of the
+    cleaned dataset. CPU-bound (pandas); raises ValueError for invalid filters
+    or if no valid rows remain.
+    """
+    if student_data_list:
+        filters = normalize_filters(filters)
+        df = apply_filters(pd.DataFrame(student_data_list), filters)
+    else:
+        df, filters = select_rows(filters)
+        if df is None:
+            raise ValueError("No data available")
+
+    # Ensure score columns are numeric
+    score_cols = SCORE_COLUMNS
+    for col in score_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    df = df.dropna(subset=[col for col in score_cols if col in df.columns]) # Drop rows where scores are not valid
+
+    if df.empty or not all(col in df.columns for col in score_cols):
+        raise ValueError("No valid student data after processing")
+
+    df['overall_score'] = df[score_cols].mean(axis=1)
+
+    # Calculate metrics
+    total_students = len(df)
+    completed_students = df[df['overall_score'] >= COMPLETION_THRESHOLD]
+    completion_rate = (len(completed_students) / total_students) * 100 if total_students > 0 else 0
+    average_score = df['overall_score'].mean() if not df.empty else 0
+
+    dropout_students = df[df['overall_score'] < DROPOUT_THRESHOLD]
+    dropout_rate = (len(dropout_students) / total_students) * 100 if total_students > 0 else 0
+
+    active_students_count = df[(df['overall_score'] >= DROPOUT_THRESHOLD) & (df['overall_score'] < COMPLETION_THRESHOLD)].shape[0]
+
+    metrics = {
+        "average_score": round(float(average_score), 2),
+        "completion_rate": round(completion_rate, 2),
+        "dropout_rate": round(dropout_rate, 2),
+        "active_students": active_students_count,
+        "total_students": total_students,
+    }
+
+    # Weekly trend for the same filters over the last num_weeks calendar
+    # weeks, from the course record rollups (weeks without activity skipped)
+    num_weeks = 4
+    trend = [
+        {"week": point["period"], "avg_score": point["average_score"]}
+        for point in get_time_series(filters, granularity="week")[-num_weeks:]
+        if point["events"]
+    ]
+
+    return metrics, trend
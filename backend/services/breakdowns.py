@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from services.data_cleaning import FILTER_COLUMNS
+
+CROSS_SEPARATOR = '*'
+
+
+def parse_dimensions(value):
+    """
+    Parses a dimensions query value into a list of breakdowns.
+    'gender,lunch,gender*lunch' -> [['gender'], ['lunch'], ['gender', 'lunch']]
+    Raises ValueError for unknown columns.
+    """
+    breakdowns = []
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        columns = [c.strip() for c in part.split(CROSS_SEPARATOR) if c.strip()]
+        unknown = [c for c in columns if c not in FILTER_COLUMNS]
+        if unknown:
+            raise ValueError(
+                f"Unknown dimension(s): {', '.join(unknown)}. Allowed: {', '.join(FILTER_COLUMNS)}"
+            )
+        if columns and columns not in breakdowns:
+            breakdowns.append(columns)
+    return breakdowns
+
+
+def compute_breakdowns(df, breakdowns, rates=None, means=None, factorized=None):
+    """
+    Computes grouped rates/means for several breakdowns without per-group Python code.
+
+    Each column is factorized once into integer codes (shared by every breakdown
+    that uses it). A cross-tab combines codes with mixed-radix arithmetic, and
+    counts, flag sums and value sums are single np.bincount passes.
+
+    rates: {'dropout_rate': boolean array-like} -> percentage of rows where True
+    means: {'average_score': numeric array-like} -> mean per group
+    factorized: optional dict cache of column -> (codes, uniques) for this df,
+    so several calls over the same selection factorize each column only once
+    Returns [{"dimensions": [...], "rows": [{<dimension values>, "count", <metrics>}]}]
+    """
+    rates = {name: np.asarray(flags, dtype=float) for name, flags in (rates or {}).items()}
+    means = {name: np.asarray(values, dtype=float) for name, values in (means or {}).items()}
+
+    if factorized is None:
+        factorized = {}
+    for columns in breakdowns:
+        for column in columns:
+            if column not in factorized and column in df.columns:
+                factorized[column] = pd.factorize(df[column], sort=True)
+
+    results = []
+    for columns in breakdowns:
+        if any(column not in factorized for column in columns):
+            results.append({"dimensions": columns, "rows": []})
+            continue
+
+        combined = np.zeros(len(df), dtype=np.int64)
+        valid = np.ones(len(df), dtype=bool)
+        size = 1
+        for column in columns:
+            codes, uniques = factorized[column]
+            valid &= codes >= 0
+            combined = combined * len(uniques) + np.maximum(codes, 0)
+            size *= len(uniques)
+
+        combined = combined[valid]
+        counts = np.bincount(combined, minlength=size)
+        rate_sums = {name: np.bincount(combined, weights=flags[valid], minlength=size) for name, flags in rates.items()}
+        mean_sums = {name: np.bincount(combined, weights=values[valid], minlength=size) for name, values in means.items()}
+
+        rows = []
+        for group in np.flatnonzero(counts):
+            row = {}
+            remainder = int(group)
+            for column in reversed(columns):
+                uniques = factorized[column][1]
+                remainder, code = divmod(remainder, len(uniques))
+                row[column] = uniques[code]
+            row = {column: row[column] for column in columns}
+            count = int(counts[group])
+            row["count"] = count
+            for name, sums in rate_sums.items():
+                row[name] = round(float(sums[group]) / count * 100, 2)
+            for name, sums in mean_sums.items():
+                row[name] = round(float(sums[group]) / count, 2)
+            rows.append(row)
+        results.append({"dimensions": columns, "rows": rows})
+    return results
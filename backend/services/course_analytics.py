@@ -0,0 +1,330 @@
+import bisect
+import os
+import threading
+
+import pandas as pd
+
+from services.data_cleaning import COMPLETION_THRESHOLD, DROPOUT_THRESHOLD
+
+# Course-level records: one row per (course, student) attempt.
+COURSE_RECORDS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'raw', 'course_records.csv')
+
+REQUIRED_COLUMNS = ['course_id', 'student_id', 'score']
+OPTIONAL_COLUMNS = ['course_name', 'completion', 'timestamp']
+
+# -----------------------------
+# In-memory aggregate store
+# -----------------------------
+# _courses maps course_id -> running aggregates for that course.
+# _by_completion / _by_difficulty are sorted indexes of (key, course_id) tuples
+# kept in sync with _courses, so top-N / bottom-N queries are a slice.
+# _student_records maps student_id -> that student's raw course records, which
+# backs the per-student profile lookups.
+
+_lock = threading.Lock()
+# Serializes loading: the mtime check, reset and ingest of a (re)load, and
+# appends. Reentrant so callers that reset and reload (trend_series) can hold
+# it across both steps. Always taken before _lock, never while holding it.
+load_lock = threading.RLock()
+_courses = {}
+_student_records = {}
+_by_completion = []
+_by_difficulty = []
+_loaded_mtime = None
+
+# Other stores built from the same records (e.g. trend rollups) register here
+# and receive every ingested batch / reset.
+_ingest_listeners = []
+
+
+def register_ingest_listener(on_ingest, on_reset):
+    """
+    Subscribes to course record batches. on_ingest(df) receives each prepared
+    batch, on_reset() is called before a full reload. Registering forces the
+    next load to replay the whole file so the listener starts complete.
+    """
+    global _loaded_mtime
+    with _lock:
+        _ingest_listeners.append((on_ingest, on_reset))
+        _loaded_mtime = None
+
+
+def _empty_aggregate(course_id):
+    return {
+        'course_id': course_id,
+        'course_name': None,
+        'students': set(),
+        'records': 0,
+        'completed': 0,
+        'dropouts': 0,
+        'mean': 0.0,
+        'm2': 0.0,
+        'first_activity': None,
+        'last_activity': None,
+    }
+
+
+def _completion_rate(agg):
+    return agg['completed'] / agg['records'] * 100 if agg['records'] else 0.0
+
+
+def _difficulty_index(agg):
+    """
+    0 (easy) .. 1 (hard): average of the score shortfall and the non-completion share.
+    """
+    if not agg['records']:
+        return 0.0
+    score_gap = 1 - min(max(agg['mean'], 0.0), 100.0) / 100
+    non_completion = 1 - agg['completed'] / agg['records']
+    return (score_gap + non_completion) / 2
+
+
+def _index_keys(agg):
+    # Ties are broken by course_id so the ordering is deterministic.
+    return (_completion_rate(agg), agg['course_id']), (_difficulty_index(agg), agg['course_id'])
+
+
+def _remove_from_index(index, key):
+    pos = bisect.bisect_left(index, key)
+    if pos < len(index) and index[pos] == key:
+        index.pop(pos)
+
+
+def _prepare_records(df):
+    """
+    Validates and normalizes an incoming course records frame.
+    """
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Missing required course record columns: {', '.join(missing)}")
+
+    df = df.copy()
+    df['course_id'] = df['course_id'].astype(str)
+    df['student_id'] = df['student_id'].astype(str)
+    df['score'] = pd.to_numeric(df['score'], errors='coerce')
+    df = df.dropna(subset=['score'])
+
+    # Records without a completion value are completed if they pass the threshold
+    passed = df['score'] >= COMPLETION_THRESHOLD
+    if 'completion' in df.columns:
+        completion = df['completion']
+        missing = completion.isna()
+        if pd.api.types.is_numeric_dtype(completion):
+            completion = completion.fillna(0) != 0
+        else:
+            completion = completion.astype(str).str.strip().str.lower().isin(['1', '1.0', 'true', 'yes', 'completed'])
+        df['completion'] = completion.where(~missing, passed).astype(bool)
+    else:
+        df['completion'] = passed
+
+    if 'timestamp' in df.columns:
+        # utc=True: naive timestamps are read as UTC, so naive and offset-aware
+        # values can share a column and be compared across batches. ISO 8601
+        # covers dates with and without time/offset; anything else is parsed
+        # value by value.
+        raw = df['timestamp']
+        timestamps = pd.to_datetime(raw, errors='coerce', utc=True, format='ISO8601')
+        unparsed = timestamps.isna() & raw.notna()
+        if unparsed.any():
+            timestamps[unparsed] = pd.to_datetime(raw[unparsed], errors='coerce', utc=True, format='mixed')
+        df['timestamp'] = timestamps
+    else:
+        df['timestamp'] = pd.NaT
+
+    if 'course_name' not in df.columns:
+        df['course_name'] = None
+
+    return df
+
+
+def _merged_aggregate(agg, row):
+    """
+    Returns a new aggregate combining `agg` with one course's batch totals
+    (Chan et al. parallel mean/variance update). `agg` is not modified, and the
+    students set is shared; the caller adds the batch's students to it.
+    """
+    merged = dict(agg)
+    n_a, n_b = agg['records'], int(row['records'])
+    m2_b = (0.0 if pd.isna(row['var']) else float(row['var'])) * (n_b - 1)
+    delta = float(row['mean']) - agg['mean']
+    total = n_a + n_b
+    merged['mean'] = agg['mean'] + delta * n_b / total
+    merged['m2'] = agg['m2'] + m2_b + delta * delta * n_a * n_b / total
+    merged['records'] = total
+    merged['completed'] = agg['completed'] + int(row['completed'])
+    merged['dropouts'] = agg['dropouts'] + int(row['dropouts'])
+
+    if isinstance(row['course_name'], str) and row['course_name']:
+        merged['course_name'] = row['course_name']
+    if pd.notna(row['first_activity']):
+        if agg['first_activity'] is None or row['first_activity'] < agg['first_activity']:
+            merged['first_activity'] = row['first_activity']
+    if pd.notna(row['last_activity']):
+        if agg['last_activity'] is None or row['last_activity'] > agg['last_activity']:
+            merged['last_activity'] = row['last_activity']
+    return merged
+
+
+def ingest_course_records(df):
+    """
+    Merges a batch of course records into the running per-course aggregates.
+    The batch is reduced with one vectorized groupby and then combined with the
+    existing aggregates (Chan et al. parallel mean/variance update), so ingest
+    cost is proportional to the batch, not to the history.
+    Returns the number of records ingested.
+    """
+    df = _prepare_records(df)
+    if df.empty:
+        return 0
+
+    df['is_dropout'] = df['score'] < DROPOUT_THRESHOLD
+    grouped = df.groupby('course_id', sort=False)
+    batch = grouped.agg(
+        records=('score', 'size'),
+        mean=('score', 'mean'),
+        var=('score', 'var'),
+        completed=('completion', 'sum'),
+        dropouts=('is_dropout', 'sum'),
+        first_activity=('timestamp', 'min'),
+        last_activity=('timestamp', 'max'),
+        course_name=('course_name', 'last'),
+    )
+    students = grouped['student_id'].unique()
+
+    with _lock:
+        for course_id, row in batch.iterrows():
+            agg = _courses.get(course_id)
+            # Compute the new aggregate first, so a failure leaves the store untouched
+            merged = _merged_aggregate(agg if agg is not None else _empty_aggregate(course_id), row)
+
+            if agg is not None:
+                old_completion_key, old_difficulty_key = _index_keys(agg)
+                _remove_from_index(_by_completion, old_completion_key)
+                _remove_from_index(_by_difficulty, old_difficulty_key)
+            merged['students'].update(students[course_id])
+            _courses[course_id] = merged
+
+            completion_key, difficulty_key = _index_keys(merged)
+            bisect.insort(_by_completion, completion_key)
+            bisect.insort(_by_difficulty, difficulty_key)
+
+        student_rows = df[['student_id', 'course_id', 'course_name', 'score', 'completion', 'timestamp']]
+        for record in student_rows.itertuples(index=False):
+            _student_records.setdefault(record.student_id, []).append(record)
+
+    for on_ingest, _ in list(_ingest_listeners):
+        on_ingest(df)
+
+    return len(df)
+
+
+def reset_course_analytics():
+    """Drops every aggregate (used before a full reload)."""
+    global _loaded_mtime
+    with _lock:
+        _courses.clear()
+        _by_completion.clear()
+        _by_difficulty.clear()
+        _student_records.clear()
+        _loaded_mtime = None
+    for _, on_reset in list(_ingest_listeners):
+        on_reset()
+
+
+def load_course_records():
+    """
+    Loads course_records.csv into the aggregate store.
+    The file is only re-read when its modification time changes.
+    """
+    global _loaded_mtime
+    with load_lock:
+        if not os.path.exists(COURSE_RECORDS_PATH):
+            return False
+
+        mtime = os.path.getmtime(COURSE_RECORDS_PATH)
+        if mtime == _loaded_mtime:
+            return True
+
+        try:
+            df = pd.read_csv(COURSE_RECORDS_PATH)
+            reset_course_analytics()
+            ingest_course_records(df)
+            _loaded_mtime = mtime
+            return True
+        except Exception as e:
+            print("Error loading course records:", e)
+            return False
+
+
+def append_course_records(df):
+    """
+    Persists a batch of new course records to course_records.csv and folds it
+    into the live aggregates without re-reading the file.
+    """
+    global _loaded_mtime
+    with load_lock:
+        load_course_records()
+
+        df = _prepare_records(df)
+        os.makedirs(os.path.dirname(COURSE_RECORDS_PATH), exist_ok=True)
+        write_header = not os.path.exists(COURSE_RECORDS_PATH)
+        if write_header:
+            columns = REQUIRED_COLUMNS + OPTIONAL_COLUMNS
+        else:
+            # Keep the column order of the existing file
+            columns = list(pd.read_csv(COURSE_RECORDS_PATH, nrows=0).columns)
+        df.reindex(columns=columns).to_csv(COURSE_RECORDS_PATH, mode='a', header=write_header, index=False)
+
+        ingested = ingest_course_records(df)
+        _loaded_mtime = os.path.getmtime(COURSE_RECORDS_PATH)
+        return ingested
+
+
+def _course_summary(agg):
+    variance = agg['m2'] / (agg['records'] - 1) if agg['records'] > 1 else 0.0
+    return {
+        'course_id': agg['course_id'],
+        'course_name': agg['course_name'] or agg['course_id'],
+        'num_students': len(agg['students']),
+        'num_records': agg['records'],
+        'average_score': round(agg['mean'], 2),
+        'score_variance': round(variance, 2),
+        'completion_rate': round(_completion_rate(agg), 2),
+        'dropout_rate': round(agg['dropouts'] / agg['records'] * 100, 2) if agg['records'] else 0.0,
+        'difficulty_index': round(_difficulty_index(agg), 4),
+        'first_activity': agg['first_activity'].isoformat() if agg['first_activity'] is not None else None,
+        'last_activity': agg['last_activity'].isoformat() if agg['last_activity'] is not None else None,
+    }
+
+
+def get_course_analytics():
+    """Returns the summary of every course, ordered by course_id."""
+    load_course_records()
+    with _lock:
+        return [_course_summary(_courses[course_id]) for course_id in sorted(_courses)]
+
+
+def get_student_course_records(student_id):
+    """
+    Returns the course records of one student (namedtuples with course_id,
+    course_name, score, completion and timestamp), in ingest order.
+    """
+    load_course_records()
+    with _lock:
+        return list(_student_records.get(str(student_id), []))
+
+
+def get_top_courses(limit=5):
+    """Courses with the highest completion rate."""
+    load_course_records()
+    with _lock:
+        keys = _by_completion[-limit:][::-1] if limit > 0 else []
+        return [_course_summary(_courses[course_id]) for _, course_id in keys]
+
+
+def get_hardest_courses(limit=5):
+    """Courses with the highest difficulty index."""
+    load_course_records()
+    with _lock:
+        keys = _by_difficulty[-limit:][::-1] if limit > 0 else []
+        return [_course_summary(_courses[course_id]) for _, course_id in keys]
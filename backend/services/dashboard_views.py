@@ -0,0 +1,238 @@
+import math
+
+from services.data_cleaning import select_rows, SCORE_COLUMNS, COMPLETION_THRESHOLD, DROPOUT_THRESHOLD
+from services.score_sketches import (
+    get_score_distribution, get_exact_score_distribution, DEFAULT_BIN_WIDTH, SKETCH_RESOLUTION,
+)
+from services.trend_series import get_time_series, GRANULARITIES
+from services.breakdowns import parse_dimensions, compute_breakdowns
+
+VIEWS = ['dashboard', 'scores', 'trends', 'dropouts']
+
+EMPTY_STATS = {"totalStudents": 0, "completionRate": 0, "averageScore": 0, "dropoutRate": 0, "activeStudents": 0}
+
+
+# -----------------------------
+# Shared selection
+# -----------------------------
+
+def parse_view_options(args, default_window=4):
+    """
+    Reads the view parameters shared by the dashboard endpoints from request.args.
+    Raises ValueError for invalid values, so a request is rejected before any
+    view is computed.
+    """
+    try:
+        bin_width = float(args.get('bin_width', DEFAULT_BIN_WIDTH))
+    except (TypeError, ValueError):
+        raise ValueError("bin_width must be a number")
+    try:
+        window = int(args.get('window', default_window))
+    except (TypeError, ValueError):
+        raise ValueError("window must be an integer")
+    if not math.isfinite(bin_width) or bin_width < SKETCH_RESOLUTION:
+        raise ValueError(f"bin_width must be at least {SKETCH_RESOLUTION}")
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    granularity = args.get('granularity', 'week')
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'. Allowed: {', '.join(GRANULARITIES)}")
+
+    return {
+        'bin_width': bin_width,
+        'exact': str(args.get('exact', 'false')).lower() == 'true',
+        'granularity': granularity,
+        'window': window,
+        'dimensions': parse_dimensions(args.get('dimensions')),
+    }
+
+
+def prepare_selection(filters):
+    """
+    Selects the filtered rows once (memoized per canonical filter set) and
+    derives everything the views share: overall_score, the completion/dropout/
+    active bands and a cache of factorized category codes. Returns None if no
+    data is available; raises ValueError for invalid filters.
+    """
+    df, filters = select_rows(filters)
+    if df is None:
+        return None
+
+    existing_score_cols = [col for col in SCORE_COLUMNS if col in df.columns]
+    selection = {
+        'df': df,
+        'filters': filters,
+        'score_cols': existing_score_cols,
+        'factorized': {},
+    }
+
+    if not df.empty and existing_score_cols:
+        overall_score = df[existing_score_cols].mean(axis=1)
+        df['overall_score'] = overall_score
+        selection['is_completed'] = (overall_score >= COMPLETION_THRESHOLD).to_numpy()
+        selection['is_dropout'] = (overall_score < DROPOUT_THRESHOLD).to_numpy()
+        selection['is_active'] = ~selection['is_completed'] & ~selection['is_dropout']
+
+    return selection
+
+
+def _has_scores(selection):
+    return 'is_completed' in selection
+
+
+# -----------------------------
+# Views
+# -----------------------------
+# Each view returns (payload, status) with the same payload its standalone
+# endpoint has always returned.
+
+def dashboard_view(selection, options):
+    df = selection['df']
+    if df.empty or not _has_scores(selection):
+        return {"stats": EMPTY_STATS, "studentData": []}, 200
+
+    total_students = len(df)
+    completion_rate = selection['is_completed'].sum() / total_students * 100
+    dropout_rate = selection['is_dropout'].sum() / total_students * 100
+    average_score = df['overall_score'].mean()
+
+    return {
+        "stats": {
+            "totalStudents": total_students,
+            "completionRate": round(float(completion_rate), 1),
+            "averageScore": round(float(average_score), 1),
+            "dropoutRate": round(float(dropout_rate), 1),
+            "activeStudents": int(selection['is_active'].sum()),
+        },
+        # Convert dataframe to list of dictionaries for JSON serialization
+        "studentData": df.to_dict(orient='records')
+    }, 200
+
+
+def scores_view(selection, options):
+    df = selection['df']
+    if df.empty:
+        return {"scoreDistribution": [], "scorePercentiles": {}, "performanceByTestPrep": []}, 200
+    if not _has_scores(selection):
+        return {"error": "No score data available"}, 500
+
+    # Score Distribution: fixed-width bins plus percentiles, read from the
+    # per-cell sketches (or computed directly from the rows with exact=true)
+    try:
+        if options['exact']:
+            score_distribution, score_percentiles = get_exact_score_distribution(df['overall_score'], options['bin_width'])
+        else:
+            score_distribution, score_percentiles = get_score_distribution(selection['filters'], options['bin_width'])
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    # Performance by Test Preparation
+    performance_by_test_prep = compute_breakdowns(
+        df, [['test_preparation_course']],
+        means={'average_score': df['overall_score']},
+        factorized=selection['factorized']
+    )[0]['rows']
+
+    return {
+        "scoreDistribution": score_distribution,
+        "scorePercentiles": score_percentiles,
+        "performanceByTestPrep": performance_by_test_prep
+    }, 200
+
+
+def trends_view(selection, options):
+    df = selection['df']
+    if df.empty:
+        return {"completionTrend": [], "averageScoresBySubject": [], "breakdowns": []}, 200
+    if not _has_scores(selection):
+        return {"error": "No score data available"}, 500
+
+    # Learning Completion Trend (completion over time from the course record rollups)
+    completion_trend = get_time_series(
+        selection['filters'], granularity=options['granularity'], window=options['window']
+    )
+
+    # Average Scores (per subject)
+    average_scores_by_subject = [
+        {"subject": col, "average_score": float(score)}
+        for col, score in df[selection['score_cols']].mean().items()
+    ]
+
+    # Completion rate and average score for each requested dimension / cross-tab
+    breakdown_results = compute_breakdowns(
+        df,
+        options['dimensions'],
+        rates={'completion_rate': selection['is_completed']},
+        means={'average_score': df['overall_score']},
+        factorized=selection['factorized']
+    )
+
+    return {
+        "completionTrend": completion_trend,
+        "averageScoresBySubject": average_scores_by_subject,
+        "breakdowns": breakdown_results
+    }, 200
+
+
+def dropouts_view(selection, options):
+    df = selection['df']
+    if df.empty:
+        return {"dropoutByEducation": [], "dropoutByGender": [], "breakdowns": []}, 200
+    if not _has_scores(selection):
+        return {"error": "No score data available"}, 500
+
+    # Dropout patterns by parental level of education and by gender, plus any
+    # requested dimensions, computed together from categorical codes
+    breakdowns = [['parental_level_of_education'], ['gender']] + options['dimensions']
+    results = compute_breakdowns(
+        df, breakdowns,
+        rates={'dropout_rate': selection['is_dropout']},
+        factorized=selection['factorized']
+    )
+
+    return {
+        "dropoutByEducation": results[0]['rows'],
+        "dropoutByGender": results[1]['rows'],
+        "breakdowns": results[2:]
+    }, 200
+
+
+VIEW_BUILDERS = {
+    'dashboard': dashboard_view,
+    'scores': scores_view,
+    'trends': trends_view,
+    'dropouts': dropouts_view,
+}
+
+
+def build_view(view, filters, options):
+    """Computes a single view (used by the standalone endpoints)."""
+    try:
+        selection = prepare_selection(filters)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    if selection is None:
+        return {"error": "No data available"}, 500
+    return VIEW_BUILDERS[view](selection, options)
+
+
+def build_views(views, filters, options):
+    """
+    Computes several views from one filtered selection. Returns
+    ({view: payload}, status); if any view fails, the whole request fails with
+    that view's error and status.
+    """
+    try:
+        selection = prepare_selection(filters)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    if selection is None:
+        return {"error": "No data available"}, 500
+
+    payloads = {}
+    for view in views:
+        payload, status = VIEW_BUILDERS[view](selection, options)
+        if status != 200:
+            return {"error": f"{view}: {payload.get('error', 'failed')}"}, status
+        payloads[view] = payload
+    return payloads, 200
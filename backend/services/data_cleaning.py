@@ -1,41 +1,410 @@
 import pandas as pd
+import numpy as np
 import os
+import re
+import csv
+import json
+import time
+import tempfile
+import threading
+import warnings
+from datetime import datetime
+from collections import OrderedDict
 
 # Define paths for raw and cleaned data
-RAW_DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'raw', 'StudentsPerformance.csv')
+RAW_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'raw')
+RAW_DATA_PATH = os.path.join(RAW_DATA_DIR, 'StudentsPerformance.csv')
 CLEANED_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'cleaned')
 CLEANED_FILE_PATH = os.path.join(CLEANED_DATA_DIR, 'cleaned_students.csv')
+# student_id of each cleaned row with its source row, content fingerprint and
+# category values, kept between refreshes so corrected rows keep their ID
+STUDENT_ID_MAP_PATH = os.path.join(CLEANED_DATA_DIR, 'student_id_map.csv')
+
+QUARANTINE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'quarantine')
+QUARANTINE_FILE_PATH = os.path.join(QUARANTINE_DIR, 'quarantined_students.csv')
+VALIDATION_REPORT_PATH = os.path.join(QUARANTINE_DIR, 'validation_report.json')
 
 os.makedirs(CLEANED_DATA_DIR, exist_ok=True)
 
-def clean_students_dataset(raw_file_name: str):
-    """
-    Cleans the raw Kaggle dataset and stores a cleaned version in data/cleaned.
-    """
+# Categorical columns the dashboard can filter on
+FILTER_COLUMNS = ['gender', 'race_ethnicity', 'parental_level_of_education', 'lunch', 'test_preparation_course']
 
-    raw_path = os.path.join(RAW_DATA_DIR, raw_file_name)
-    cleaned_path = os.path.join(CLEANED_DATA_DIR, "cleaned_students.csv")
+SCORE_COLUMNS = ['math_score', 'reading_score', 'writing_score']
+REQUIRED_COLUMNS = FILTER_COLUMNS + SCORE_COLUMNS
+SCORE_MIN = 0
+SCORE_MAX = 100
 
-    # Make sure cleaned dir exists
-    os.makedirs(CLEANED_DATA_DIR, exist_ok=True)
+# Overall score bands shared by the dashboard, models and course analytics:
+# completed at or above COMPLETION_THRESHOLD, dropout below DROPOUT_THRESHOLD
+COMPLETION_THRESHOLD = 60
+DROPOUT_THRESHOLD = 40
 
-    # Load raw CSV into Pandas dataframe
-    df = pd.read_csv(raw_path)
+# Values accepted for each category (matched ignoring case and surrounding
+# spaces); anything else is quarantined. Missing values become MISSING_CATEGORY.
+ALLOWED_CATEGORIES = {
+    'gender': ['female', 'male'],
+    'race_ethnicity': ['group A', 'group B', 'group C', 'group D', 'group E'],
+    'parental_level_of_education': [
+        "associate's degree", "bachelor's degree", 'high school',
+        "master's degree", 'some college', 'some high school',
+    ],
+    'lunch': ['free/reduced', 'standard'],
+    'test_preparation_course': ['completed', 'none'],
+}
+MISSING_CATEGORY = 'Unknown'
 
-    # Standardize column names (lowercase, underscores)
-    df.columns = (
-        df.columns
+# A changed row keeps the ID of the student previously at its source row only
+# if at least this many of its FILTER_COLUMNS values are unchanged
+ID_REUSE_MIN_MATCHING = len(FILTER_COLUMNS) - 1
+
+CLEANING_CHUNKSIZE = 500_000
+
+# A refresh whose rows are mostly quarantined is treated as a bad download and
+# leaves the current cleaned dataset in place
+MAX_QUARANTINE_SHARE = 0.5
+
+# Filtered row selections kept per data version (least recently used evicted first)
+SELECTION_CACHE_SIZE = 256
+
+_frame_lock = threading.Lock()
+_frame = None
+_frame_version = None
+_category_values = {}           # column -> {lowercased value: value}
+_selections = OrderedDict()     # (version, filter key) -> row positions
+
+def _standardize_columns(columns):
+    """Standardize column names (lowercase, underscores)."""
+    return (
+        pd.Index(columns)
         .str.strip()
         .str.lower()
         .str.replace(" ", "_")
         .str.replace("-", "_")
+        .str.replace("/", "_")
     )
 
-    # Remove duplicate rows
-    df = df.drop_duplicates()
+def _distinct_values(raw):
+    """
+    Factorizes a column so checks run once per distinct value instead of once
+    per row (score and category columns repeat a few hundred values at most).
+    Returns (codes, uniques); missing values get code -1.
+    """
+    codes, uniques = pd.factorize(raw)
+    return codes, pd.Series(uniques, dtype=object)
+
+def validate_chunk(chunk):
+    """
+    Validates one chunk of raw rows (all columns read as strings) with
+    column-wide checks: scores must be numbers within SCORE_MIN-SCORE_MAX,
+    categories must be in ALLOWED_CATEGORIES and a row needs at least one score.
+    Returns (valid rows with typed scores and canonical categories,
+    quarantined raw rows with a 'reasons' column, {reason: count}).
+    """
+    checks = {}
+    typed = chunk.copy()
+
+    present_scores = []
+    for column in SCORE_COLUMNS:
+        codes, uniques = _distinct_values(chunk[column])
+        unique_scores = pd.to_numeric(uniques, errors="coerce").to_numpy(dtype=float)
+        scores = np.where(codes >= 0, unique_scores[codes], np.nan)
+        checks[f"non_numeric_{column}"] = (codes >= 0) & np.isnan(scores)
+        checks[f"{column}_out_of_range"] = (scores < SCORE_MIN) | (scores > SCORE_MAX)
+        typed[column] = scores
+        present_scores.append(codes >= 0)
+    checks["missing_all_scores"] = ~np.logical_or.reduce(present_scores)
+
+    for column, allowed in ALLOWED_CATEGORIES.items():
+        lookup = {value.lower(): value for value in allowed}
+        codes, uniques = _distinct_values(chunk[column])
+        unique_canonical = np.array(
+            [lookup.get(str(value).strip().lower()) for value in uniques] + [MISSING_CATEGORY], dtype=object
+        )
+        canonical = unique_canonical[codes]  # code -1 picks MISSING_CATEGORY
+        checks[f"invalid_{column}"] = (codes >= 0) & pd.isna(canonical)
+        typed[column] = canonical
 
-    # Remove fully empty rows
-    df = df.dropna(how="all")
+    # One reasons string per bad row, built column-wise over the bad rows only
+    bad = np.logical_or.reduce(list(checks.values()))
+    reasons = np.full(int(bad.sum()), "", dtype=object)
+    reason_counts = {}
+    for name, mask in checks.items():
+        count = int(mask.sum())
+        if count:
+            reason_counts[name] = count
+            reasons = reasons + np.where(mask[bad], name + ";", "")
+
+    valid = typed[~bad]
+    for column in SCORE_COLUMNS:
+        # Rejected text values made the column float; keep integer scores integers
+        scores = valid[column]
+        if scores.notna().all() and (scores % 1 == 0).all():
+            valid[column] = scores.astype("int64")
+
+    quarantined = chunk[bad].copy()
+    quarantined["reasons"] = [r.rstrip(";") for r in reasons]
+    return valid, quarantined, reason_counts
+
+def write_validation_report(report):
+    os.makedirs(QUARANTINE_DIR, exist_ok=True)
+    with open(VALIDATION_REPORT_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+
+def load_validation_report():
+    """Returns the report of the last cleaning run, or None."""
+    try:
+        with open(VALIDATION_REPORT_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_csv_atomic(df, path):
+    """
+    Writes df to a temporary file next to path and renames it into place, so
+    readers never see a half-written CSV.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    try:
+        with os.fdopen(fd, "w", newline="") as out:
+            df.to_csv(out, index=False)
+        # mkstemp creates the file 0600; keep the mode of the file being replaced
+        os.chmod(tmp_path, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def load_student_id_map():
+    """The ID map written by the last clean, or None if there is none."""
+    if not os.path.exists(STUDENT_ID_MAP_PATH):
+        return None
+    try:
+        return pd.read_csv(STUDENT_ID_MAP_PATH, dtype=str, keep_default_na=False).astype({"source_row": int})
+    except (OSError, ValueError):
+        return None
+
+def _assign_student_ids(df, source_rows):
+    """
+    Returns the ID map for the cleaned rows: student_id, source_row,
+    fingerprint, the FILTER_COLUMNS values and active. Students no longer in
+    the file stay in the map with active=False, so their IDs are never handed
+    to anyone else and come back if the same row reappears. Raises ValueError
+    if the IDs are not unique.
+
+    A row keeps a previous ID when its content is unchanged (matched by
+    fingerprint, wherever it moved in the file), or else when it sits at the
+    same source row as an active student, that ID is not taken and at least
+    ID_REUSE_MIN_MATCHING of its category values are unchanged: a corrected
+    score or category keeps the student's ID, a different student inserted in
+    the place of a deleted one does not. Other rows are new and get an ID
+    derived from their fingerprint that is not in the map.
+    """
+    fingerprints = pd.Series(
+        ["%016x" % h for h in pd.util.hash_pandas_object(df, index=False)], index=df.index
+    )
+    categories = df[FILTER_COLUMNS].astype(str)
+    ids = pd.Series(None, index=df.index, dtype=object)
+
+    previous = load_student_id_map()
+    if previous is not None and len(previous):
+        if "active" not in previous.columns:
+            previous["active"] = True
+        previous["active"] = previous["active"].astype(str).str.lower() == "true"
+        by_fingerprint = previous.drop_duplicates("fingerprint", keep="last").set_index("fingerprint")["student_id"]
+        ids = fingerprints.map(by_fingerprint)
+
+        unmatched = ids.isna()
+        if all(column in previous.columns for column in FILTER_COLUMNS):
+            active = previous[previous["active"]].drop_duplicates("source_row", keep="last")
+            at_row = active.set_index("source_row").reindex(source_rows[unmatched].to_numpy())
+            same = (at_row[FILTER_COLUMNS].astype(str).to_numpy() == categories[unmatched].to_numpy()).sum(axis=1)
+            by_row = pd.Series(at_row["student_id"].to_numpy(), index=ids.index[unmatched])
+            taken = set(ids.dropna())
+            by_row = by_row[by_row.notna() & ~by_row.isin(taken) & (same >= ID_REUSE_MIN_MATCHING)]
+            ids[by_row.index] = by_row
+    else:
+        previous = None
+
+    # New IDs must not collide with any ID in the map (active or not) or
+    # already assigned in this run
+    used = set(ids.dropna()) | (set(previous["student_id"]) if previous is not None else set())
+    for index in ids.index[ids.isna()]:
+        student_id, attempt = "stu_" + fingerprints[index], 0
+        while student_id in used:
+            attempt += 1
+            digest = pd.util.hash_array(np.array([f"{fingerprints[index]}:{attempt}"], dtype=object))[0]
+            student_id = "stu_%016x" % digest
+        ids[index] = student_id
+        used.add(student_id)
+
+    id_map = pd.DataFrame({"student_id": ids.values, "source_row": source_rows.values, "fingerprint": fingerprints.values})
+    for column in FILTER_COLUMNS:
+        id_map[column] = categories[column].values
+    id_map["active"] = True
+    if previous is not None:
+        retired = previous[~previous["student_id"].isin(set(id_map["student_id"]))].assign(active=False)
+        id_map = pd.concat([id_map, retired.reindex(columns=id_map.columns)], ignore_index=True)
+    if not id_map["student_id"].is_unique:
+        raise ValueError("Student ID assignment produced duplicate IDs")
+    return id_map
+
+def _short_records(raw_path, n_fields, candidates):
+    """
+    Finds the rows among `candidates` (data row positions) that have fewer than
+    n_fields fields in the raw file. The parser pads those with missing values,
+    so they cannot be told apart from rows with empty trailing fields once
+    parsed. Returns {position: (file line, fields seen)}.
+    """
+    short = {}
+    position = 0
+    with open(raw_path, newline="", encoding="utf-8", errors="replace") as f:
+        reader = csv.reader(f)
+        next(reader, None)  # header
+        for fields in reader:
+            if not fields or len(fields) > n_fields:
+                continue  # blank lines and over-long lines are skipped by the parser
+            if len(fields) < n_fields and position in candidates:
+                short[position] = (reader.line_num, len(fields))
+            position += 1
+    return short
+
+def clean_students_dataset(raw_file_name: str, chunksize: int = CLEANING_CHUNKSIZE):
+    """
+    Cleans the raw Kaggle dataset and stores a cleaned version in data/cleaned.
+
+    The raw file is read in chunks; each chunk goes through validate_chunk and
+    rows that fail are written to data/quarantine with their reasons, along
+    with a validation report. Lines with the wrong number of fields are
+    quarantined as malformed. Raises ValueError, leaving the current cleaned
+    file untouched, if required columns are missing, no row is valid or more
+    than MAX_QUARANTINE_SHARE of the rows are quarantined. The cleaned file is
+    replaced atomically.
+    """
+    started = time.perf_counter()
+    raw_path = os.path.join(RAW_DATA_DIR, raw_file_name)
+    cleaned_path = os.path.join(CLEANED_DATA_DIR, "cleaned_students.csv")
+
+    # Make sure cleaned and quarantine dirs exist
+    os.makedirs(CLEANED_DATA_DIR, exist_ok=True)
+    os.makedirs(QUARANTINE_DIR, exist_ok=True)
+
+    # Schema check on the header before reading any rows
+    header = _standardize_columns(pd.read_csv(raw_path, nrows=0).columns)
+    missing_columns = [column for column in REQUIRED_COLUMNS if column not in header]
+    report = {
+        "source": raw_file_name,
+        "validated_at": datetime.now().isoformat(),
+        "schema": {
+            "missing_columns": missing_columns,
+            "extra_columns": [column for column in header if column not in REQUIRED_COLUMNS],
+        },
+    }
+    if missing_columns:
+        report["status"] = "schema_error"
+        write_validation_report(report)
+        raise ValueError(f"Raw dataset is missing required column(s): {', '.join(missing_columns)}")
+
+    valid_parts = []
+    rows_read = rows_quarantined = malformed_lines = empty_rows = 0
+    reason_counts = {}
+    quarantine_header = True
+    short_candidates = set()
+    # source_row: position among the parsed data rows; source_line: file line
+    # of a malformed row (rows with too many fields have no parsed values)
+    quarantine_columns = ["source_row", "source_line"] + list(header) + ["reasons"]
+
+    def quarantine(rows):
+        nonlocal quarantine_header
+        rows.reindex(columns=quarantine_columns).to_csv(
+            QUARANTINE_FILE_PATH, mode="w" if quarantine_header else "a", header=quarantine_header, index=False
+        )
+        quarantine_header = False
+
+    # Load raw CSV in chunks; everything is read as text so quarantined rows keep their raw values
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", pd.errors.ParserWarning)
+        for chunk in pd.read_csv(raw_path, dtype=str, chunksize=chunksize, on_bad_lines="warn"):
+            chunk.columns = header
+            rows_read += len(chunk)
+            # A row with too few fields is padded, so its last column is missing
+            short_candidates.update(chunk.index[chunk[header[-1]].isna()])
+
+            # Remove fully empty rows
+            non_empty = chunk.dropna(how="all")
+            empty_rows += len(chunk) - len(non_empty)
+            chunk = non_empty
+            chunk.insert(0, "source_row", chunk.index)
+
+            valid, bad, counts = validate_chunk(chunk)
+            valid_parts.append(valid)
+            if len(bad):
+                quarantine(bad)
+                rows_quarantined += len(bad)
+            for reason, count in counts.items():
+                reason_counts[reason] = reason_counts.get(reason, 0) + count
+
+    # Lines the parser skipped (wrong number of fields)
+    malformed = [
+        match for warning in caught if issubclass(warning.category, pd.errors.ParserWarning)
+        for match in re.findall(r"Skipping line (\d+): (.*)", str(warning.message))
+    ]
+    if malformed:
+        malformed_lines = len(malformed)
+        reason_counts["malformed_row"] = malformed_lines
+        quarantine(pd.DataFrame({
+            "source_line": [int(line) for line, _ in malformed],
+            "reasons": ["malformed_row: " + detail.strip() for _, detail in malformed],
+        }))
+
+    # Lines with too few fields, which the parser kept; only rows that passed
+    # validation need moving, the others are quarantined already
+    short = _short_records(raw_path, len(header), short_candidates) if short_candidates else {}
+    if short:
+        is_short = [part["source_row"].isin(short) for part in valid_parts]
+        rows = pd.concat([part[mask] for part, mask in zip(valid_parts, is_short)])
+        valid_parts = [part[~mask] for part, mask in zip(valid_parts, is_short)]
+        if len(rows):
+            rows.insert(1, "source_line", [short[position][0] for position in rows["source_row"]])
+            rows["reasons"] = [
+                f"malformed_row: expected {len(header)} fields, saw {short[position][1]}"
+                for position in rows["source_row"]
+            ]
+            quarantine(rows)
+            rows_quarantined += len(rows)
+            reason_counts["malformed_row"] = reason_counts.get("malformed_row", 0) + len(rows)
+
+    if quarantine_header and os.path.exists(QUARANTINE_FILE_PATH):
+        os.remove(QUARANTINE_FILE_PATH)  # nothing quarantined this run
+
+    # Refuse to replace the cleaned dataset with an empty or mostly rejected one
+    rows_rejected = rows_quarantined + malformed_lines
+    rows_valid = sum(len(part) for part in valid_parts)
+    if not rows_valid or rows_rejected > MAX_QUARANTINE_SHARE * (rows_valid + rows_rejected):
+        report.update({
+            "status": "rejected",
+            "rows_read": rows_read,
+            "rows_valid": rows_valid,
+            "rows_quarantined": rows_quarantined,
+            "malformed_lines": malformed_lines,
+            "empty_rows_dropped": empty_rows,
+            "reasons": reason_counts,
+            "quarantine_file": QUARANTINE_FILE_PATH if rows_rejected else None,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        })
+        write_validation_report(report)
+        if not rows_valid:
+            raise ValueError(f"Raw dataset has no valid rows ({rows_rejected} quarantined)")
+        raise ValueError(
+            f"{rows_rejected} of {rows_valid + rows_rejected} raw rows quarantined "
+            f"(more than {MAX_QUARANTINE_SHARE:.0%}); keeping the current cleaned dataset"
+        )
+
+    df = pd.concat(valid_parts, ignore_index=True)
+
+    # Remove duplicate rows
+    rows_before_dedupe = len(df)
+    df = df.drop_duplicates(subset=[column for column in df.columns if column != "source_row"])
 
     # Fill missing numeric values with column mean
     numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns
@@ -45,39 +414,182 @@ def clean_students_dataset(raw_file_name: str):
     text_cols = df.select_dtypes(include=["object"]).columns
     df[text_cols] = df[text_cols].fillna("Unknown")
 
+    # Stable student_id: taken from the source when it has one, otherwise
+    # carried over from the previous refresh through the ID map
+    source_rows = df.pop("source_row")
+    if "student_id" not in df.columns:
+        id_map = _assign_student_ids(df, source_rows)
+        df.insert(0, "student_id", id_map["student_id"].values[:len(df)])
+    else:
+        id_map = None
+
     # Save cleaned dataset
-    df.to_csv(cleaned_path, index=False)
+    _write_csv_atomic(df, cleaned_path)
+    if id_map is not None:
+        _write_csv_atomic(id_map, STUDENT_ID_MAP_PATH)
+
+    report.update({
+        "status": "ok",
+        "rows_read": rows_read,
+        "rows_valid": len(df),
+        "rows_quarantined": rows_quarantined,
+        "malformed_lines": malformed_lines,
+        "empty_rows_dropped": empty_rows,
+        "duplicates_removed": rows_before_dedupe - len(df),
+        "reasons": reason_counts,
+        "quarantine_file": QUARANTINE_FILE_PATH if rows_quarantined or malformed_lines else None,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    })
+    write_validation_report(report)
+    print(f"Validated {rows_read} rows: {len(df)} kept, {rows_quarantined + malformed_lines} quarantined.")
 
     return df, cleaned_path
 
 
+def parse_filter_values(filters):
+    """
+    Turns a filters dict ({'gender': 'male,female', ...}) into
+    {'gender': ['male', 'female']}, dropping empty filters.
+    """
+    parsed = {}
+    for column, value in (filters or {}).items():
+        if not value:
+            continue
+        if isinstance(value, str):
+            parsed[column] = [v.strip() for v in value.split(',')]
+        else:
+            parsed[column] = list(value)
+    return parsed
+
 def apply_filters(df, filters):
     """
     Applies a dictionary of filters to the DataFrame.
     Filters should be in the format: {'column_name': 'value'}
     """
     filtered_df = df.copy()
-    for column, value in filters.items():
-        if value and column in filtered_df.columns:
+    for column, values in parse_filter_values(filters).items():
+        if column in filtered_df.columns:
             # Handle multiple values for a single filter (e.g., 'gender=male,female')
-            if isinstance(value, str) and ',' in value:
-                values = [v.strip() for v in value.split(',')]
-                filtered_df = filtered_df[filtered_df[column].isin(values)]
-            else:
-                filtered_df = filtered_df[filtered_df[column] == value]
+            filtered_df = filtered_df[filtered_df[column].isin(values)]
     return filtered_df
 
+def _cached_frame():
+    """
+    Returns (version, DataFrame) for cleaned_students.csv, reading the file only
+    when its version changed. The frame is shared: callers must not modify it.
+    """
+    global _frame, _frame_version, _category_values
+    version = get_data_version()
+    with _frame_lock:
+        if version is not None and version == _frame_version:
+            return version, _frame
+
+    df = pd.read_csv(CLEANED_FILE_PATH)
+    category_values = {
+        column: {str(value).lower(): value for value in df[column].dropna().unique()}
+        for column in FILTER_COLUMNS if column in df.columns
+    }
+    with _frame_lock:
+        _frame = df
+        _frame_version = version
+        _category_values = category_values
+        _selections.clear()
+    return version, df
+
 def load_cleaned_data():
     """Loads the cleaned_students.csv file and returns a DataFrame."""
     try:
-        cleaned_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            "..",
-            "data",
-            "cleaned",
-            "cleaned_students.csv"
-        )
-        return pd.read_csv(cleaned_path)
+        return _cached_frame()[1].copy()
     except Exception as e:
         print("Error loading cleaned data:", e)
         return None
+
+def get_data_version():
+    """
+    Returns a token that changes whenever cleaned_students.csv is rewritten
+    (its modification time), or None if the file does not exist.
+    Caches built from the cleaned data are keyed on this value.
+    """
+    try:
+        return os.path.getmtime(CLEANED_FILE_PATH)
+    except OSError:
+        return None
+
+# -----------------------------
+# Canonical filters and memoized selections
+# -----------------------------
+
+def normalize_filters(filters):
+    """
+    Returns the canonical form of a filters dict: {column: sorted unique values}
+    in FILTER_COLUMNS order, with values matched case-insensitively to the
+    categories present in the cleaned data. 'female, male', 'male,female,male'
+    and 'Male,female' all become {'gender': ['female', 'male']}.
+    Raises ValueError for unknown columns or values.
+    """
+    parsed = parse_filter_values(filters)
+    unknown_columns = [column for column in parsed if column not in FILTER_COLUMNS]
+    if unknown_columns:
+        raise ValueError(f"Unknown filter(s): {', '.join(unknown_columns)}")
+
+    try:
+        _cached_frame()
+    except Exception as e:
+        print("Error loading cleaned data:", e)
+    with _frame_lock:
+        category_values = _category_values
+
+    normalized = {}
+    for column in FILTER_COLUMNS:
+        values = [v for v in parsed.get(column, []) if v]
+        if not values:
+            continue
+        known = category_values.get(column)
+        if known is not None:
+            unknown = [v for v in values if v.lower() not in known]
+            if unknown:
+                raise ValueError(
+                    f"Unknown value(s) for {column}: {', '.join(unknown)}. "
+                    f"Allowed: {', '.join(sorted(map(str, known.values())))}"
+                )
+            values = [known[v.lower()] for v in values]
+        normalized[column] = sorted(set(values))
+    return normalized
+
+def filter_key(filters):
+    """Hashable key for canonical filters (see normalize_filters)."""
+    return tuple((column, tuple(values)) for column, values in filters.items())
+
+def select_rows(filters):
+    """
+    Returns (filtered DataFrame, canonical filters). The row positions of each
+    canonical filter set are memoized per data version, so repeated or permuted
+    filter combinations only pay for a take(). The DataFrame is None if no data
+    is available. Raises ValueError for invalid filters.
+    """
+    filters = normalize_filters(filters)
+    try:
+        version, df = _cached_frame()
+    except Exception as e:
+        print("Error loading cleaned data:", e)
+        return None, filters
+
+    key = (version, filter_key(filters))
+    with _frame_lock:
+        positions = _selections.get(key)
+        if positions is not None:
+            _selections.move_to_end(key)
+
+    if positions is None:
+        mask = np.ones(len(df), dtype=bool)
+        for column, values in filters.items():
+            if column in df.columns:
+                mask &= df[column].isin(values).to_numpy()
+        positions = np.flatnonzero(mask)
+        with _frame_lock:
+            if version == _frame_version:
+                _selections[key] = positions
+                while len(_selections) > SELECTION_CACHE_SIZE:
+                    _selections.popitem(last=False)
+
+    return df.take(positions), filters
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime
+
+from utils.kaggle_download import download_kaggle_dataset
+from services.data_cleaning import clean_students_dataset, load_validation_report
+
+DATASET_ID = "spscientist/students-performance-in-exams"
+RAW_FILE_NAME = "StudentsPerformance.csv"
+
+
+def _refresh_result(df, cleaned_file_path):
+    # Count rows from the dataframe
+    row_count = len(df) if df is not None else 0
+    report = load_validation_report() or {}
+    return {
+        "status": "success",
+        "rows_added": row_count,
+        "rows_quarantined": report.get("rows_quarantined", 0) + report.get("malformed_lines", 0),
+        "validation": {"reasons": report.get("reasons", {}), "quarantine_file": report.get("quarantine_file")},
+        "cleaned_file": cleaned_file_path,
+        "last_updated": datetime.now().isoformat()
+    }
+
+
+def _cleaning_failed(error):
+    return {"status": "error", "message": str(error)}
+
+
+def _download_failed():
+    return {"status": "error", "message": f"Failed to download dataset {DATASET_ID}"}
+
+
+def refresh_status(result):
+    """HTTP status for a refresh result: 502 when the download failed or its data was unusable."""
+    return 502 if result.get("status") == "error" else 200
+
+
+def refresh_dataset():
+    """
+    Downloads the Kaggle dataset and rebuilds the cleaned file.
+    """
+    # 1. Download dataset from Kaggle
+    if download_kaggle_dataset(DATASET_ID) is None:
+        return _download_failed()
+
+    # 2. Validate and clean the downloaded dataset (bad rows are quarantined)
+    try:
+        df, cleaned_file_path = clean_students_dataset(RAW_FILE_NAME)
+    except ValueError as e:
+        return _cleaning_failed(e)
+
+    return _refresh_result(df, cleaned_file_path)
+
+
+async def refresh_dataset_async(io_executor, cpu_executor):
+    """
+    Coroutine version of refresh_dataset. The blocking download runs on
+    io_executor and the pandas cleaning on cpu_executor, so the event loop
+    stays free while either is in progress.
+    """
+    loop = asyncio.get_running_loop()
+    if await loop.run_in_executor(io_executor, download_kaggle_dataset, DATASET_ID) is None:
+        return _download_failed()
+    try:
+        df, cleaned_file_path = await loop.run_in_executor(cpu_executor, clean_students_dataset, RAW_FILE_NAME)
+    except ValueError as e:
+        return _cleaning_failed(e)
+    return _refresh_result(df, cleaned_file_path)
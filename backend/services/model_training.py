@@ -0,0 +1,259 @@
+"""
+Offline model training: k-fold evaluation of several candidate estimators in
+parallel, plus an incremental (partial_fit) path for files too large to load.
+
+    python -m services.model_training                 # cross-validated search
+    python -m services.model_training --incremental   # chunked partial_fit
+"""
+import argparse
+import itertools
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+from sklearn.model_selection import StratifiedKFold, cross_validate
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from services.data_cleaning import load_cleaned_data, CLEANED_FILE_PATH, SCORE_COLUMNS, COMPLETION_THRESHOLD
+
+CATEGORICAL_FEATURES = ['test_preparation_course', 'parental_level_of_education', 'lunch', 'gender']
+NUMERICAL_FEATURES = ['overall_score']
+FEATURES = NUMERICAL_FEATURES + CATEGORICAL_FEATURES
+
+SCORING = ['accuracy', 'roc_auc', 'f1']
+SELECTION_METRIC = 'roc_auc'
+
+# (name, estimator, parameter grid); every combination is one candidate
+CANDIDATES = [
+    ('logistic_regression', LogisticRegression(solver='liblinear', random_state=42), {'C': [0.1, 1.0, 10.0]}),
+    ('gradient_boosting', GradientBoostingClassifier(random_state=42), {'learning_rate': [0.05, 0.1], 'max_depth': [2, 3]}),
+    ('sgd_logistic', SGDClassifier(loss='log_loss', random_state=42), {'alpha': [1e-4, 1e-3]}),
+]
+
+# Tie-break between candidates with the same SELECTION_METRIC: lower complexity
+# first, then lower mean fit time
+MODEL_COMPLEXITY = {'logistic_regression': 0, 'sgd_logistic': 0, 'gradient_boosting': 1}
+
+INCREMENTAL_CHUNKSIZE = 100_000
+INCREMENTAL_SAMPLE_SIZE = 50_000  # rows used to fit the preprocessor in incremental mode
+VALIDATION_EVERY = 5              # incremental mode holds out every 5th row
+
+
+# -----------------------------
+# Data and pipeline
+# -----------------------------
+
+def prepare_training_frame(df):
+    """Adds overall_score and the completion target; returns (features, target)."""
+    existing_score_cols = [col for col in SCORE_COLUMNS if col in df.columns]
+    if not existing_score_cols:
+        raise ValueError("No score data available for model training.")
+
+    df = df.copy()
+    df['overall_score'] = df[existing_score_cols].mean(axis=1)
+    target = (df['overall_score'] >= COMPLETION_THRESHOLD).astype(int)
+    return df[FEATURES], target
+
+
+def build_preprocessor(categories='auto'):
+    return ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), NUMERICAL_FEATURES),
+            ('cat', OneHotEncoder(categories=categories, handle_unknown='ignore'), CATEGORICAL_FEATURES)
+        ],
+        remainder='passthrough' # Keep other columns if any
+    )
+
+
+def expand_candidates(candidates=CANDIDATES):
+    """Yields (name, params, estimator) for every grid combination."""
+    for name, estimator, grid in candidates:
+        keys = list(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            params = dict(zip(keys, values))
+            yield name, params, clone(estimator).set_params(**params)
+
+
+# -----------------------------
+# Cross-validated search
+# -----------------------------
+
+def _evaluate_candidate(name, params, estimator, features, target, folds):
+    pipeline = Pipeline(steps=[('preprocessor', build_preprocessor()), ('classifier', estimator)])
+    cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+
+    started = time.perf_counter()
+    scores = cross_validate(pipeline, features, target, cv=cv, scoring=SCORING, n_jobs=1)
+    elapsed = time.perf_counter() - started
+
+    result = {"name": name, "params": params, "cv_time_seconds": round(elapsed, 3)}
+    for metric in SCORING:
+        values = scores[f'test_{metric}']
+        result[metric] = round(float(np.mean(values)), 4)
+        result[f'{metric}_std'] = round(float(np.std(values)), 4)
+    result['fit_time_seconds'] = round(float(np.mean(scores['fit_time'])), 4)
+    return result
+
+
+def _selection_key(result):
+    # Best metric first, then the simpler and faster-to-fit candidate
+    return (-result[SELECTION_METRIC], MODEL_COMPLEXITY.get(result['name'], len(MODEL_COMPLEXITY)), result['fit_time_seconds'])
+
+
+def select_best_model(df=None, folds=5, n_jobs=-1, candidates=CANDIDATES):
+    """
+    Runs k-fold evaluation of every candidate in parallel (one joblib task per
+    candidate), refits the best one on all rows and returns (pipeline, report).
+    Candidates tied on SELECTION_METRIC are ranked by MODEL_COMPLEXITY, then fit
+    time; the report lists the tied candidates.
+    """
+    if df is None:
+        df = load_cleaned_data()
+    if df is None or df.empty:
+        raise ValueError("No data available for model training.")
+
+    features, target = prepare_training_frame(df)
+    folds = max(2, min(folds, int(target.value_counts().min())))
+
+    expanded = list(expand_candidates(candidates))
+    started = time.perf_counter()
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_candidate)(name, params, estimator, features, target, folds)
+        for name, params, estimator in expanded
+    )
+    search_time = time.perf_counter() - started
+
+    best_index = min(range(len(results)), key=lambda i: _selection_key(results[i]))
+    best_name, best_params, best_estimator = expanded[best_index]
+    tied = [r for r in results if r[SELECTION_METRIC] == results[best_index][SELECTION_METRIC]]
+
+    pipeline = Pipeline(steps=[('preprocessor', build_preprocessor()), ('classifier', clone(best_estimator))])
+    fit_started = time.perf_counter()
+    pipeline.fit(features, target)
+    fit_time = time.perf_counter() - fit_started
+
+    report = {
+        "mode": "cross_validation",
+        "trained_at": datetime.now().isoformat(),
+        "rows": int(len(features)),
+        "folds": folds,
+        "selection_metric": SELECTION_METRIC,
+        "search_time_seconds": round(search_time, 3),
+        "final_fit_time_seconds": round(fit_time, 3),
+        "best": results[best_index],
+        "tied_candidates": len(tied),
+        "candidates": sorted(results, key=_selection_key),
+    }
+    if len(tied) > 1:
+        # The target is overall_score >= COMPLETION_THRESHOLD and overall_score is
+        # a feature, so every reasonable model separates the classes perfectly
+        report["note"] = (
+            f"{len(tied)} of {len(results)} candidates tie on {SELECTION_METRIC} "
+            f"({results[best_index][SELECTION_METRIC]}): the search cannot tell them apart "
+            f"(the target is derived from overall_score, which is a feature); "
+            f"picked the simplest, fastest-fitting one"
+        )
+    return pipeline, report
+
+
+# -----------------------------
+# Incremental training
+# -----------------------------
+
+def train_incremental(csv_path=CLEANED_FILE_PATH, chunksize=INCREMENTAL_CHUNKSIZE, alpha=1e-4, epochs=1):
+    """
+    Trains an SGD logistic model with partial_fit over CSV chunks, so memory is
+    bounded by the chunk size. Pass 1 collects the category sets and a random
+    sample to fit the preprocessor; pass 2 streams the chunks through partial_fit,
+    holding out every VALIDATION_EVERY-th row for the reported metrics.
+    Returns (pipeline, report).
+    """
+    rng = np.random.default_rng(42)
+    categories = {col: set() for col in CATEGORICAL_FEATURES}
+    sample, sample_keys = None, None
+
+    started = time.perf_counter()
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+        features, _ = prepare_training_frame(chunk)
+        for col in CATEGORICAL_FEATURES:
+            categories[col].update(features[col].dropna().unique())
+        # Reservoir sample: every row gets a uniform random key and the rows with
+        # the INCREMENTAL_SAMPLE_SIZE smallest keys seen so far are kept, which
+        # is a uniform sample of the whole file whatever the chunk sizes
+        keys = rng.random(len(features))
+        if sample is not None:
+            features = pd.concat([sample, features])
+            keys = np.concatenate([sample_keys, keys])
+        if len(keys) > INCREMENTAL_SAMPLE_SIZE:
+            keep = np.argpartition(keys, INCREMENTAL_SAMPLE_SIZE)[:INCREMENTAL_SAMPLE_SIZE]
+            features, keys = features.iloc[keep], keys[keep]
+        sample, sample_keys = features, keys
+
+    if sample is None or sample.empty:
+        raise ValueError("No data available for model training.")
+
+    preprocessor = build_preprocessor(categories=[sorted(categories[col]) for col in CATEGORICAL_FEATURES])
+    preprocessor.fit(sample)
+
+    classifier = SGDClassifier(loss='log_loss', alpha=alpha, random_state=42)
+    validation_target, validation_features = [], []
+    rows = 0
+    for epoch in range(epochs):
+        offset = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            features, target = prepare_training_frame(chunk)
+            holdout = (np.arange(offset, offset + len(features)) % VALIDATION_EVERY) == 0
+            offset += len(features)
+
+            X = preprocessor.transform(features[~holdout])
+            classifier.partial_fit(X, target[~holdout], classes=np.array([0, 1]))
+            rows += int((~holdout).sum())
+
+            if epoch == epochs - 1 and holdout.any():
+                validation_target.append(target[holdout].to_numpy())
+                validation_features.append(features[holdout])
+    train_time = time.perf_counter() - started
+
+    pipeline = Pipeline(steps=[('preprocessor', preprocessor), ('classifier', classifier)])
+
+    metrics = {}
+    if validation_target:
+        y_true = np.concatenate(validation_target)
+        proba = pipeline.predict_proba(pd.concat(validation_features))[:, 1]
+        metrics = {
+            "accuracy": round(float(accuracy_score(y_true, proba >= 0.5)), 4),
+            "f1": round(float(f1_score(y_true, proba >= 0.5)), 4),
+            "roc_auc": round(float(roc_auc_score(y_true, proba)), 4) if len(np.unique(y_true)) > 1 else None,
+        }
+
+    report = {
+        "mode": "incremental",
+        "trained_at": datetime.now().isoformat(),
+        "rows": rows,
+        "epochs": epochs,
+        "chunksize": chunksize,
+        "train_time_seconds": round(train_time, 3),
+        "best": {"name": "sgd_logistic", "params": {"alpha": alpha}, **metrics},
+    }
+    return pipeline, report
+
+
+if __name__ == "__main__":
+    from services.prediction_model import train_and_save_model
+
+    parser = argparse.ArgumentParser(description="Train and persist the completion prediction model.")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel joblib workers (-1 = all cores)")
+    parser.add_argument("--incremental", action="store_true", help="Stream the CSV through partial_fit")
+    parser.add_argument("--chunksize", type=int, default=INCREMENTAL_CHUNKSIZE)
+    args = parser.parse_args()
+
+    train_and_save_model(folds=args.folds, n_jobs=args.jobs, incremental=args.incremental, chunksize=args.chunksize)
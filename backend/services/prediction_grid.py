@@ -0,0 +1,181 @@
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+from services.data_cleaning import load_cleaned_data, get_data_version, SCORE_MIN, SCORE_MAX
+from services.model_training import CATEGORICAL_FEATURES
+from services.prediction_model import get_model_components_with_version
+
+# -----------------------------
+# What-if prediction grid
+# -----------------------------
+# The model only consumes overall_score plus a few low-cardinality categoricals,
+# so its whole input space fits in a small table: completion likelihood at evenly
+# spaced scores over 0-100, for every combination of CATEGORICAL_FEATURES values,
+# computed once per model version. A prediction is then a dict lookup plus linear
+# interpolation between the two nearest scores.
+#
+# Interpolation is only as good as the model is smooth: a logistic model is fine
+# at GRID_SCORE_STEP, a tree ensemble is a step function. After each build the
+# model is evaluated at every interval midpoint; while the interpolation error
+# there exceeds GRID_TOLERANCE the spacing is halved, down to GRID_MIN_SCORE_STEP.
+# If it is still too large the grid is marked as not interpolable and lookups
+# call predict_proba directly.
+
+GRID_SCORE_MIN = float(SCORE_MIN)
+GRID_SCORE_MAX = float(SCORE_MAX)
+GRID_SCORE_STEP = 0.5
+GRID_MIN_SCORE_STEP = 0.0625
+GRID_TOLERANCE = 0.005
+
+_lock = threading.Lock()
+_grid = None           # {"version", "categories", "index", "scores", "likelihood", "interpolate", ...}
+_defaults = None
+_defaults_version = None
+
+
+def _model_categories(preprocessor):
+    """Category values the model was trained on, per CATEGORICAL_FEATURES column."""
+    try:
+        encoder = preprocessor.named_transformers_['cat']
+        return {column: [str(v) for v in values] for column, values in zip(CATEGORICAL_FEATURES, encoder.categories_)}
+    except (AttributeError, KeyError):
+        df = load_cleaned_data()
+        if df is None:
+            return None
+        return {column: sorted(df[column].dropna().astype(str).unique()) for column in CATEGORICAL_FEATURES}
+
+
+def _predict_table(model_pipeline, combinations, scores):
+    """predict_proba for every (combination, score), shaped (combinations, scores)."""
+    inputs = pd.DataFrame(
+        np.repeat(np.array(combinations, dtype=object), len(scores), axis=0),
+        columns=CATEGORICAL_FEATURES
+    )
+    inputs.insert(0, 'overall_score', np.tile(scores, len(combinations)))
+    return model_pipeline.predict_proba(inputs)[:, 1].reshape(len(combinations), len(scores))
+
+
+def _build_grid(model_pipeline, preprocessor, version):
+    categories = _model_categories(preprocessor)
+    if not categories:
+        return None
+
+    combinations = list(itertools.product(*(categories[column] for column in CATEGORICAL_FEATURES)))
+    step = GRID_SCORE_STEP
+    scores = np.arange(GRID_SCORE_MIN, GRID_SCORE_MAX + step / 2, step)
+    likelihood = _predict_table(model_pipeline, combinations, scores)
+    while True:
+        midpoints = (scores[:-1] + scores[1:]) / 2
+        at_midpoints = _predict_table(model_pipeline, combinations, midpoints)
+        max_error = float(np.abs(at_midpoints - (likelihood[:, :-1] + likelihood[:, 1:]) / 2).max())
+        if max_error <= GRID_TOLERANCE or step / 2 < GRID_MIN_SCORE_STEP:
+            break
+        # Halve the spacing: the midpoints are the new scores in between
+        step /= 2
+        scores = np.arange(GRID_SCORE_MIN, GRID_SCORE_MAX + step / 2, step)
+        refined = np.empty((len(combinations), len(scores)))
+        refined[:, 0::2] = likelihood
+        refined[:, 1::2] = at_midpoints
+        likelihood = refined
+
+    interpolate = max_error <= GRID_TOLERANCE
+    if not interpolate:
+        print(f"Prediction grid: interpolation error {max_error:.3f} at step {step} exceeds "
+              f"{GRID_TOLERANCE}; predictions use predict_proba directly.")
+    return {
+        "version": version,
+        "categories": categories,
+        "index": {combination: row for row, combination in enumerate(combinations)},
+        "scores": scores,
+        "step": step,
+        "likelihood": likelihood,
+        "max_error": max_error,
+        "interpolate": interpolate,
+        "model": model_pipeline,
+    }
+
+
+def get_prediction_grid():
+    """
+    Returns the grid for the current model, rebuilding it when the model was
+    swapped, or None if no model is available.
+    """
+    global _grid
+    model_pipeline, preprocessor, version = get_model_components_with_version()
+    if model_pipeline is None:
+        return None
+
+    with _lock:
+        if _grid is not None and _grid["version"] == version:
+            return _grid
+
+    grid = _build_grid(model_pipeline, preprocessor, version)
+    with _lock:
+        _grid = grid
+    return grid
+
+
+def get_default_categories():
+    """Most common value of each categorical feature in the cleaned data (per data version)."""
+    global _defaults, _defaults_version
+    version = get_data_version()
+    with _lock:
+        if _defaults is not None and version == _defaults_version:
+            return _defaults
+
+    df = load_cleaned_data()
+    if df is None or df.empty:
+        return None
+    defaults = {column: str(df[column].mode()[0]) for column in CATEGORICAL_FEATURES if column in df.columns}
+    with _lock:
+        _defaults = defaults
+        _defaults_version = version
+    return defaults
+
+
+def lookup_completion_likelihood(grid, overall_score, categories):
+    """
+    Interpolates the completion likelihood for one student from the grid.
+    categories: {column: value} for every CATEGORICAL_FEATURES column.
+    Raises ValueError for values the model does not know.
+    """
+    unknown = [
+        f"{column}={categories.get(column)}" for column in CATEGORICAL_FEATURES
+        if categories.get(column) not in grid["categories"][column]
+    ]
+    if unknown:
+        raise ValueError(f"Unknown value(s): {', '.join(unknown)}")
+
+    if not grid["interpolate"]:
+        inputs = pd.DataFrame([{'overall_score': overall_score, **{column: categories[column] for column in CATEGORICAL_FEATURES}}])
+        return float(grid["model"].predict_proba(inputs)[0, 1])
+
+    row = grid["index"][tuple(categories[column] for column in CATEGORICAL_FEATURES)]
+    return float(np.interp(overall_score, grid["scores"], grid["likelihood"][row]))
+
+
+def grid_payload(grid, defaults):
+    """
+    JSON form of the grid for clients that interpolate locally. When the model
+    cannot be interpolated within GRID_TOLERANCE, interpolate is false and the
+    table is left out: clients should call /predict instead.
+    """
+    return {
+        "model_version": grid["version"],
+        "features": CATEGORICAL_FEATURES,
+        "categories": grid["categories"],
+        "defaults": defaults or {},
+        "interpolate": grid["interpolate"],
+        "max_interpolation_error": round(grid["max_error"], 4),
+        "scores": [round(float(score), 4) for score in grid["scores"]] if grid["interpolate"] else [],
+        "grid": [
+            {
+                **dict(zip(CATEGORICAL_FEATURES, combination)),
+                "completion_likelihood": np.round(grid["likelihood"][row], 4).tolist(),
+            }
+            for combination, row in grid["index"].items()
+        ] if grid["interpolate"] else [],
+    }
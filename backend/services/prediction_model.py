@@ -1,16 +1,13 @@
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.compose import ColumnTransformer
-from sklearn.pipeline import Pipeline
 import joblib
+import json
 import os
 
-from services.data_cleaning import load_cleaned_data, apply_filters
+from services.model_training import select_best_model, train_incremental
 
 MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', 'model', 'prediction_model.joblib')
 PREPROCESSOR_PATH = os.path.join(os.path.dirname(__file__), '..', 'model', 'preprocessor.joblib')
+TRAINING_REPORT_PATH = os.path.join(os.path.dirname(__file__), '..', 'model', 'training_report.json')
 MODEL_DIR = os.path.join(os.path.dirname(__file__), '..', 'model')
 
 os.makedirs(MODEL_DIR, exist_ok=True)
@@ -18,63 +15,64 @@ os.makedirs(MODEL_DIR, exist_ok=True)
 # Global variable to hold the loaded model and preprocessor
 _model_pipeline = None
 _preprocessor = None
+_model_version = None  # mtime of MODEL_PATH when the model was loaded
 
-def train_and_save_model():
+def get_model_version():
+    """
+    Returns a token that changes whenever the saved model is replaced (its
+    modification time), or None if no model has been saved.
+    Caches built from model predictions are keyed on this value.
+    """
+    try:
+        return os.path.getmtime(MODEL_PATH)
+    except OSError:
+        return None
+
+def train_and_save_model(folds=5, n_jobs=-1, incremental=False, chunksize=None):
     """
     Trains the prediction model using the cleaned data and saves it.
+    By default runs a parallel k-fold search over the candidate estimators in
+    services.model_training and keeps the best; incremental=True streams the
+    cleaned CSV through partial_fit instead.
     """
     print("Training and saving prediction model...")
-    df = load_cleaned_data()
-    if df is None or df.empty:
-        print("No data available for model training.")
-        return False
-
-    score_cols = ['math_score', 'reading_score', 'writing_score']
-    existing_score_cols = [col for col in score_cols if col in df.columns]
-    if not existing_score_cols:
-        print("No score data available for model training.")
+    try:
+        if incremental:
+            kwargs = {'chunksize': chunksize} if chunksize else {}
+            model_pipeline, report = train_incremental(**kwargs)
+        else:
+            model_pipeline, report = select_best_model(folds=folds, n_jobs=n_jobs)
+    except ValueError as e:
+        print(e)
         return False
 
-    df['overall_score'] = df[existing_score_cols].mean(axis=1)
-    df['completion'] = (df['overall_score'] >= 60).astype(int) # Target variable
-
-    # Features to use for training
-    features = df[['overall_score', 'test_preparation_course', 'parental_level_of_education', 'lunch', 'gender']]
-    target = df['completion']
-
-    # Preprocessing for categorical and numerical features
-    categorical_features = ['test_preparation_course', 'parental_level_of_education', 'lunch', 'gender']
-    numerical_features = ['overall_score']
-
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ('num', StandardScaler(), numerical_features),
-            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
-        ],
-        remainder='passthrough' # Keep other columns if any
-    )
-
-    # Create a pipeline with preprocessor and logistic regression model
-    model_pipeline = Pipeline(steps=[('preprocessor', preprocessor),
-                                   ('classifier', LogisticRegression(solver='liblinear', random_state=42))])
-    
-    # Train the model
-    model_pipeline.fit(features, target)
+    best = report['best']
+    print(f"Best model: {best['name']} {best['params']} ({', '.join(f'{k}={best[k]}' for k in ('accuracy', 'roc_auc', 'f1') if k in best)})")
 
     # Save the trained model and preprocessor
     joblib.dump(model_pipeline, MODEL_PATH)
-    joblib.dump(preprocessor, PREPROCESSOR_PATH) # Save preprocessor separately if needed for feature names etc.
+    joblib.dump(model_pipeline.named_steps['preprocessor'], PREPROCESSOR_PATH) # Save preprocessor separately if needed for feature names etc.
+    with open(TRAINING_REPORT_PATH, 'w') as f:
+        json.dump(report, f, indent=2)
+    _unload_model()  # the next request loads the new model
     print("Prediction model trained and saved successfully.")
     return True
 
+def _unload_model():
+    global _model_pipeline, _preprocessor, _model_version
+    _model_pipeline = None
+    _preprocessor = None
+    _model_version = None
+
 def load_model():
     """
     Loads the pre-trained prediction model and preprocessor.
     """
-    global _model_pipeline, _preprocessor
+    global _model_pipeline, _preprocessor, _model_version
     if _model_pipeline is None or _preprocessor is None:
         if os.path.exists(MODEL_PATH) and os.path.exists(PREPROCESSOR_PATH):
             print("Loading pre-trained prediction model...")
+            _model_version = get_model_version()
             _model_pipeline = joblib.load(MODEL_PATH)
             _preprocessor = joblib.load(PREPROCESSOR_PATH)
             print("Prediction model loaded successfully.")
@@ -82,6 +80,7 @@ def load_model():
             print("No pre-trained model found. Training a new one...")
             train_and_save_model()
             if os.path.exists(MODEL_PATH) and os.path.exists(PREPROCESSOR_PATH):
+                _model_version = get_model_version()
                 _model_pipeline = joblib.load(MODEL_PATH)
                 _preprocessor = joblib.load(PREPROCESSOR_PATH)
             else:
@@ -93,12 +92,20 @@ def load_model():
 def get_trained_model_components():
     """
     Returns the globally loaded model pipeline and preprocessor.
-    Ensures model is loaded if not already.
+    Ensures model is loaded if not already, and reloads it if the saved
+    model was replaced (e.g. retrained from the command line).
     """
+    if _model_pipeline is not None and get_model_version() != _model_version:
+        _unload_model()
     if _model_pipeline is None or _preprocessor is None:
         load_model()
     return _model_pipeline, _preprocessor
 
+def get_model_components_with_version():
+    """Returns (model pipeline, preprocessor, model version) from one load."""
+    model_pipeline, preprocessor = get_trained_model_components()
+    return model_pipeline, preprocessor, _model_version
+
 def predict_completion_likelihood(input_data):
     """
     Makes a prediction using the loaded model.
@@ -0,0 +1,146 @@
+import threading
+
+import numpy as np
+
+from services.data_cleaning import (
+    load_cleaned_data, get_data_version, parse_filter_values,
+    FILTER_COLUMNS, SCORE_COLUMNS, SCORE_MIN, SCORE_MAX,
+)
+
+# -----------------------------
+# Per-cell score sketches
+# -----------------------------
+# Scores live on a bounded 0-100 scale, so each filter cell (one combination of
+# FILTER_COLUMNS values) keeps a fixed-resolution counting sketch: counts of
+# scores in SKETCH_RESOLUTION-wide bins [i * res, (i + 1) * res). Sketches merge
+# by addition, their size does not depend on the number of students, a quantile
+# read from them is less than SKETCH_RESOLUTION below the nearest-rank value, and
+# histograms whose bin width is a multiple of SKETCH_RESOLUTION are exact.
+
+SKETCH_RESOLUTION = 0.1
+SKETCH_BINS = int(round((SCORE_MAX - SCORE_MIN) / SKETCH_RESOLUTION)) + 1
+
+DEFAULT_BIN_WIDTH = 5
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+_lock = threading.Lock()
+_cells = None      # DataFrame: one row per cell, FILTER_COLUMNS values
+_sketches = None   # ndarray (n_cells, SKETCH_BINS) of counts
+_sketch_version = None
+
+
+def _score_to_bin(scores):
+    scores = np.clip(scores, SCORE_MIN, SCORE_MAX)
+    # The small epsilon keeps values like 0.3 / 0.1 = 2.9999999999999996 in the right bin
+    return np.floor((scores - SCORE_MIN) / SKETCH_RESOLUTION + 1e-9).astype(np.int64)
+
+
+def _ensure_sketches():
+    """Builds one sketch per filter cell from the cleaned data (once per data version)."""
+    global _cells, _sketches, _sketch_version
+    version = get_data_version()
+    if version is not None and version == _sketch_version:
+        return
+
+    df = load_cleaned_data()
+    cells, sketches = None, np.zeros((0, SKETCH_BINS), dtype=np.int64)
+    if df is not None and not df.empty:
+        existing_score_cols = [col for col in SCORE_COLUMNS if col in df.columns]
+        cell_cols = [col for col in FILTER_COLUMNS if col in df.columns]
+        if existing_score_cols:
+            df = df.dropna(subset=existing_score_cols)
+            overall_score = df[existing_score_cols].mean(axis=1).to_numpy()
+
+            grouped = df.groupby(cell_cols, sort=False, dropna=False) if cell_cols else None
+            cell_codes = grouped.ngroup().to_numpy() if grouped is not None else np.zeros(len(df), dtype=np.int64)
+            n_cells = int(cell_codes.max()) + 1 if len(cell_codes) else 0
+
+            flat = cell_codes * SKETCH_BINS + _score_to_bin(overall_score)
+            sketches = np.bincount(flat, minlength=n_cells * SKETCH_BINS).reshape(n_cells, SKETCH_BINS)
+            cells = df[cell_cols].iloc[
+                np.unique(cell_codes, return_index=True)[1]
+            ].reset_index(drop=True) if cell_cols else None
+
+    with _lock:
+        _cells = cells
+        _sketches = sketches
+        _sketch_version = version
+
+
+def _merged_sketch(filters):
+    """Adds up the sketches of every cell that matches the filters."""
+    _ensure_sketches()
+    with _lock:
+        cells, sketches = _cells, _sketches
+
+    if sketches is None or len(sketches) == 0:
+        return np.zeros(SKETCH_BINS, dtype=np.int64)
+
+    mask = np.ones(len(sketches), dtype=bool)
+    if cells is not None:
+        for column, values in parse_filter_values(filters).items():
+            if column in cells.columns:
+                mask &= cells[column].isin(values).to_numpy()
+    return sketches[mask].sum(axis=0)
+
+
+def _histogram_edges(bin_width):
+    bin_width = float(bin_width)
+    if bin_width < SKETCH_RESOLUTION:
+        # Also bounds the payload to at most SKETCH_BINS - 1 bins
+        raise ValueError(f"bin_width must be at least {SKETCH_RESOLUTION}")
+    edges = np.arange(SCORE_MIN, SCORE_MAX, bin_width)
+    return np.append(edges, SCORE_MAX)
+
+
+def _format_histogram(edges, counts):
+    return [
+        {
+            "score": round(float((start + end) / 2), 2),
+            "bin_start": round(float(start), 2),
+            "bin_end": round(float(end), 2),
+            "count": int(count),
+        }
+        for start, end, count in zip(edges[:-1], edges[1:], counts)
+    ]
+
+
+def get_score_distribution(filters=None, bin_width=DEFAULT_BIN_WIDTH, percentiles=DEFAULT_PERCENTILES):
+    """
+    Returns (histogram, percentiles) for the students matching the filters,
+    read from the merged cell sketches. The histogram has fixed-width bins over
+    0-100 (the last bin includes 100); percentiles use the nearest-rank rule.
+    """
+    sketch = _merged_sketch(filters)
+    edges = _histogram_edges(bin_width)
+
+    # Each sketch bin starts at SCORE_MIN + i * SKETCH_RESOLUTION
+    sketch_scores = SCORE_MIN + np.arange(SKETCH_BINS) * SKETCH_RESOLUTION
+    bin_index = np.floor((sketch_scores - SCORE_MIN) / float(bin_width) + 1e-9).astype(np.int64)
+    bin_index = np.clip(bin_index, 0, len(edges) - 2)
+    counts = np.bincount(bin_index, weights=sketch, minlength=len(edges) - 1)
+
+    total = int(sketch.sum())
+    result = {}
+    if total:
+        cumulative = np.cumsum(sketch)
+        for p in percentiles:
+            rank = max(int(np.ceil(p / 100 * total)), 1)
+            result[f"p{p}"] = round(float(sketch_scores[np.searchsorted(cumulative, rank)]), 2)
+    return _format_histogram(edges, counts), result
+
+
+def get_exact_score_distribution(overall_score, bin_width=DEFAULT_BIN_WIDTH, percentiles=DEFAULT_PERCENTILES):
+    """
+    Same output as get_score_distribution, computed directly from a Series of
+    overall scores. Used to verify the sketches.
+    """
+    scores = np.clip(overall_score.dropna().to_numpy(dtype=float), SCORE_MIN, SCORE_MAX)
+    edges = _histogram_edges(bin_width)
+    counts, _ = np.histogram(scores, bins=edges)
+
+    result = {}
+    if len(scores):
+        for p in percentiles:
+            result[f"p{p}"] = round(float(np.percentile(scores, p, method='inverted_cdf')), 2)
+    return _format_histogram(edges, counts), result
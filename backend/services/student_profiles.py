@@ -0,0 +1,144 @@
+import threading
+
+import pandas as pd
+
+from services.data_cleaning import load_cleaned_data, get_data_version, FILTER_COLUMNS, SCORE_COLUMNS
+from services.course_analytics import get_student_course_records
+
+ATTRIBUTE_COLUMNS = FILTER_COLUMNS
+
+# -----------------------------
+# Keyed student index
+# -----------------------------
+# student_id -> cleaned record (plus overall_score). Rebuilt only when the
+# cleaned dataset changes, so a lookup is a dict access instead of a DataFrame scan.
+
+_lock = threading.Lock()
+_index = {}
+_attributes = pd.DataFrame(columns=ATTRIBUTE_COLUMNS)
+_index_version = None
+
+
+def _ensure_index():
+    global _index, _attributes, _index_version
+    version = get_data_version()
+    if version is not None and version == _index_version:
+        return
+
+    df = load_cleaned_data()
+    index = {}
+    attributes = pd.DataFrame(columns=ATTRIBUTE_COLUMNS)
+    if df is not None and not df.empty and 'student_id' in df.columns:
+        existing_score_cols = [col for col in SCORE_COLUMNS if col in df.columns]
+        if existing_score_cols:
+            df['overall_score'] = df[existing_score_cols].mean(axis=1).round(2)
+        index = dict(zip(df['student_id'].astype(str), df.to_dict(orient='records')))
+        attributes = df.set_index(df['student_id'].astype(str)).reindex(columns=ATTRIBUTE_COLUMNS)
+
+    with _lock:
+        _index = index
+        _attributes = attributes
+        _index_version = version
+
+
+def get_student_attributes():
+    """
+    Returns (data_version, DataFrame of the categorical attributes indexed by student_id),
+    for vectorized joins against event data.
+    """
+    _ensure_index()
+    with _lock:
+        return _index_version, _attributes
+
+
+def _build_profile(student_id, record, course_records):
+    course_records = sorted(
+        course_records,
+        key=lambda r: (pd.isna(r.timestamp), r.timestamp if pd.notna(r.timestamp) else 0)
+    )
+
+    score_history = []
+    activity_counts = {}
+    courses = {}
+    for r in course_records:
+        date = r.timestamp.date().isoformat() if pd.notna(r.timestamp) else None
+        score_history.append({"date": date, "course_id": r.course_id, "score": round(float(r.score), 2)})
+        if date is not None:
+            activity_counts[date] = activity_counts.get(date, 0) + 1
+
+        course = courses.setdefault(r.course_id, {
+            "course_id": r.course_id,
+            "course_name": r.course_name if isinstance(r.course_name, str) and r.course_name else r.course_id,
+            "best_score": float(r.score),
+            "completed": False,
+        })
+        course["best_score"] = max(course["best_score"], float(r.score))
+        course["completed"] = course["completed"] or bool(r.completion)
+
+    courses_enrolled = [
+        {**course, "best_score": round(course["best_score"], 2), "progress": 1.0 if course["completed"] else 0.0}
+        for course in courses.values()
+    ]
+
+    if record is not None and 'overall_score' in record:
+        average_score = record['overall_score']
+    elif score_history:
+        average_score = round(sum(s["score"] for s in score_history) / len(score_history), 2)
+    else:
+        average_score = 0
+
+    timestamps = [r.timestamp for r in course_records if pd.notna(r.timestamp)]
+    completed_courses = sum(1 for course in courses_enrolled if course["completed"])
+
+    profile = {
+        "student_id": student_id,
+        "name": "",
+        "average_score": average_score,
+        "hours_watched": 0,
+        "progress": round(completed_courses / len(courses_enrolled), 2) if courses_enrolled else 0,
+        "score_history": score_history,
+        "activity_history": [
+            {"date": date, "activity_count": count} for date, count in sorted(activity_counts.items())
+        ],
+        "last_active": max(timestamps).isoformat() if timestamps else "",
+        "courses_enrolled": courses_enrolled,
+    }
+
+    # Demographics and per-subject exam scores from the cleaned dataset
+    if record is not None:
+        for key, value in record.items():
+            if key not in profile and key != 'overall_score':
+                profile[key] = value
+
+    return profile
+
+
+def get_student_profile(student_id):
+    """
+    Returns the profile of one student, or None if the ID is unknown to both
+    the cleaned dataset and the course records.
+    """
+    _ensure_index()
+    student_id = str(student_id)
+    with _lock:
+        record = _index.get(student_id)
+
+    course_records = get_student_course_records(student_id)
+    if record is None and not course_records:
+        return None
+    return _build_profile(student_id, record, course_records)
+
+
+def get_student_profiles(student_ids):
+    """
+    Bulk lookup. Returns (profiles, not_found) preserving the order of student_ids.
+    """
+    profiles = []
+    not_found = []
+    for student_id in dict.fromkeys(str(s) for s in student_ids):
+        profile = get_student_profile(student_id)
+        if profile is None:
+            not_found.append(student_id)
+        else:
+            profiles.append(profile)
+    return profiles, not_found
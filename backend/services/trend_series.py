@@ -0,0 +1,261 @@
+import threading
+from collections import deque
+from datetime import timedelta
+
+import pandas as pd
+
+from services.data_cleaning import get_data_version, parse_filter_values
+from services.course_analytics import (
+    load_lock,
+    load_course_records,
+    reset_course_analytics,
+    register_ingest_listener,
+)
+from services.student_profiles import get_student_attributes, ATTRIBUTE_COLUMNS
+
+# -----------------------------
+# Pre-bucketed rollups
+# -----------------------------
+# Every timestamped course record is an event. Events are rolled up once, at
+# ingest time, into buckets keyed by period and "filter cell" (the tuple of the
+# student's categorical attributes, in ATTRIBUTE_COLUMNS order):
+#
+#   _daily[day][cell]   = [events, score_sum, completed, {student_ids}]
+#   _weekly[week][cell] = same, week = Monday of the ISO week
+#   _cohorts[cohort_week][week_offset][cell] = same, cohort = week of first activity
+#
+# A query only sums the buckets of matching cells, so its cost depends on the
+# number of periods and cells, not on the number of events.
+
+UNKNOWN = "Unknown"
+
+# Period length of each supported granularity
+GRANULARITIES = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+_lock = threading.Lock()
+_daily = {}
+_weekly = {}
+_cohorts = {}
+_student_cell = {}
+_student_cohort = {}
+_student_weeks = {}
+_attributes_version = None
+
+
+def _new_bucket():
+    return [0, 0.0, 0, set()]
+
+
+def _add_to_bucket(bucket, events, score_sum, completed, students):
+    bucket[0] += events
+    bucket[1] += score_sum
+    bucket[2] += completed
+    bucket[3].update(students)
+
+
+def _on_reset():
+    global _attributes_version
+    with _lock:
+        _daily.clear()
+        _weekly.clear()
+        _cohorts.clear()
+        _student_cell.clear()
+        _student_cohort.clear()
+        _student_weeks.clear()
+        _attributes_version = None
+
+
+def _roll_up(target, df, period_col):
+    grouped = df.groupby([period_col] + ATTRIBUTE_COLUMNS, sort=False)
+    sums = grouped.agg(events=('score', 'size'), score_sum=('score', 'sum'), completed=('completion', 'sum'))
+    sums['students'] = grouped['student_id'].unique()
+    for key, events, score_sum, completed, students in zip(
+        sums.index, sums['events'], sums['score_sum'], sums['completed'], sums['students']
+    ):
+        period, cell = key[0], tuple(key[1:])
+        bucket = target.setdefault(period, {}).setdefault(cell, _new_bucket())
+        _add_to_bucket(bucket, int(events), float(score_sum), int(completed), students)
+
+
+def _move_student_cohort(student_id, cell, old_cohort, new_cohort):
+    """Re-keys a student's cohort contributions after an earlier event arrived."""
+    for week, (events, score_sum, completed) in _student_weeks[student_id].items():
+        old_offsets = _cohorts[old_cohort]
+        bucket = old_offsets[(week - old_cohort).days // 7][cell]
+        bucket[0] -= events
+        bucket[1] -= score_sum
+        bucket[2] -= completed
+        bucket[3].discard(student_id)
+
+        new_bucket = _cohorts.setdefault(new_cohort, {}).setdefault((week - new_cohort).days // 7, {}).setdefault(cell, _new_bucket())
+        _add_to_bucket(new_bucket, events, score_sum, completed, [student_id])
+
+
+def _on_ingest(df):
+    global _attributes_version
+    df = df[df['timestamp'].notna()]
+    if df.empty:
+        return
+
+    version, attributes = get_student_attributes()
+    df = df[['student_id', 'score', 'completion', 'timestamp']].join(attributes, on='student_id')
+    df[ATTRIBUTE_COLUMNS] = df[ATTRIBUTE_COLUMNS].fillna(UNKNOWN)
+
+    timestamps = df['timestamp']
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None)
+    df['day'] = timestamps.dt.floor('D')
+    df['week'] = df['day'] - pd.to_timedelta(df['day'].dt.weekday, unit='D')
+    df['day'] = df['day'].dt.date
+    df['week'] = df['week'].dt.date
+
+    per_student_week = df.groupby(['student_id', 'week'] + ATTRIBUTE_COLUMNS, sort=False).agg(
+        events=('score', 'size'), score_sum=('score', 'sum'), completed=('completion', 'sum')
+    ).reset_index()
+    per_student_week['batch_first_week'] = per_student_week.groupby('student_id')['week'].transform('min')
+
+    with _lock:
+        _attributes_version = version
+        _roll_up(_daily, df, 'day')
+        _roll_up(_weekly, df, 'week')
+
+        cells = zip(*(per_student_week[col] for col in ATTRIBUTE_COLUMNS))
+        for student_id, week, batch_first_week, events, score_sum, completed, cell in zip(
+            per_student_week['student_id'], per_student_week['week'], per_student_week['batch_first_week'],
+            per_student_week['events'], per_student_week['score_sum'], per_student_week['completed'], cells
+        ):
+            cell = _student_cell.setdefault(student_id, cell)
+            old_cohort = _student_cohort.get(student_id)
+            cohort = batch_first_week if old_cohort is None else min(batch_first_week, old_cohort)
+            if old_cohort is not None and cohort != old_cohort:
+                _move_student_cohort(student_id, cell, old_cohort, cohort)
+            _student_cohort[student_id] = cohort
+
+            totals = _student_weeks.setdefault(student_id, {}).setdefault(week, [0, 0.0, 0])
+            totals[0] += int(events)
+            totals[1] += float(score_sum)
+            totals[2] += int(completed)
+            bucket = _cohorts.setdefault(cohort, {}).setdefault((week - cohort).days // 7, {}).setdefault(cell, _new_bucket())
+            _add_to_bucket(bucket, int(events), float(score_sum), int(completed), [student_id])
+
+
+register_ingest_listener(_on_ingest, _on_reset)
+
+
+def _ensure_fresh():
+    """
+    Replays the course records if they changed. If the cleaned dataset changed,
+    student attributes (and therefore cells) may have moved, so rebuild.
+    """
+    with load_lock:
+        load_course_records()
+        if _attributes_version is not None and get_data_version() != _attributes_version:
+            reset_course_analytics()
+            load_course_records()
+
+
+def _filter_sets(filters):
+    """Turns a filters dict into [(cell position, allowed values)]."""
+    parsed = parse_filter_values(filters)
+    return [
+        (position, set(parsed[column]))
+        for position, column in enumerate(ATTRIBUTE_COLUMNS)
+        if column in parsed
+    ]
+
+
+def _sum_matching(cells, filter_sets):
+    events, score_sum, completed, students = 0, 0.0, 0, 0
+    for cell, bucket in cells.items():
+        if all(cell[position] in allowed for position, allowed in filter_sets):
+            events += bucket[0]
+            score_sum += bucket[1]
+            completed += bucket[2]
+            students += len(bucket[3])  # a student has exactly one cell, so sizes add up
+    return events, score_sum, completed, students
+
+
+def get_time_series(filters=None, granularity="week", window=4):
+    """
+    Returns one point per day/week, from the first to the last period with
+    matching events, with event counts, active students, average score and
+    completion rate, plus rolling averages over the last `window` periods.
+    Periods without events are included (averages None) and count towards the
+    window. Raises ValueError for an unknown granularity.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}'. Allowed: {', '.join(GRANULARITIES)}")
+    _ensure_fresh()
+    filter_sets = _filter_sets(filters)
+    window = max(int(window), 1)
+
+    with _lock:
+        buckets = _daily if granularity == "day" else _weekly
+        totals = {}
+        for period, cells in buckets.items():
+            sums = _sum_matching(cells, filter_sets)
+            if sums[0]:
+                totals[period] = sums
+    if not totals:
+        return []
+
+    series = []
+    rolling = deque()
+    rolling_events = rolling_score = rolling_completed = 0
+    period, last, step = min(totals), max(totals), GRANULARITIES[granularity]
+    while period <= last:
+        events, score_sum, completed, students = totals.get(period, (0, 0.0, 0, 0))
+
+        rolling.append((events, score_sum, completed))
+        rolling_events += events
+        rolling_score += score_sum
+        rolling_completed += completed
+        if len(rolling) > window:
+            old_events, old_score, old_completed = rolling.popleft()
+            rolling_events -= old_events
+            rolling_score -= old_score
+            rolling_completed -= old_completed
+
+        series.append({
+            "period": period.isoformat(),
+            "events": events,
+            "active_students": students,
+            "average_score": round(score_sum / events, 2) if events else None,
+            "completion_rate": round(completed / events * 100, 2) if events else None,
+            "rolling_average_score": round(rolling_score / rolling_events, 2) if rolling_events else None,
+            "rolling_completion_rate": round(rolling_completed / rolling_events * 100, 2) if rolling_events else None,
+        })
+        period += step
+    return series
+
+
+def get_cohort_curves(filters=None):
+    """
+    Groups students by the week of their first activity and returns, per cohort,
+    the share still active and their average score N weeks later.
+    """
+    _ensure_fresh()
+    filter_sets = _filter_sets(filters)
+
+    curves = []
+    with _lock:
+        for cohort in sorted(_cohorts):
+            offsets = _cohorts[cohort]
+            cohort_size = _sum_matching(offsets.get(0, {}), filter_sets)[3]
+            if not cohort_size:
+                continue
+
+            curve = []
+            for offset in sorted(offsets):
+                events, score_sum, completed, students = _sum_matching(offsets[offset], filter_sets)
+                if not events:
+                    continue
+                curve.append({
+                    "week_offset": offset,
+                    "active_students": students,
+                    "retention_rate": round(students / cohort_size * 100, 2),
+                    "average_score": round(score_sum / events, 2),
+                    "completion_rate": round(completed / events * 100, 2),
+                })
+            curves.append({"cohort": cohort.isoformat(), "students": cohort_size, "curve": curve})
+    return curves
@@ -1,10 +1,43 @@
+import io
 import os
-import kaggle
+import time
+import zipfile
+import tempfile
+import urllib.request
 
 # Define the path where raw data will be stored
 RAW_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'raw')
 os.makedirs(RAW_DATA_DIR, exist_ok=True)
 
+# KAGGLE_BACKEND=stub skips the real download (the files already in data/raw are
+# used) after KAGGLE_STUB_LATENCY seconds, so refreshes can be exercised offline.
+# KAGGLE_BACKEND=local downloads the dataset zip from the stand-in server in
+# loadtest/standin_server.py instead (configurable latency, failures, streaming).
+KAGGLE_BACKEND = os.getenv("KAGGLE_BACKEND", "kaggle")
+KAGGLE_STUB_LATENCY = float(os.getenv("KAGGLE_STUB_LATENCY", "0"))
+KAGGLE_LOCAL_URL = os.getenv("KAGGLE_LOCAL_URL", "http://127.0.0.1:8090")
+KAGGLE_LOCAL_TIMEOUT = float(os.getenv("KAGGLE_LOCAL_TIMEOUT", "120"))
+
+def _download_from_local_server(dataset_id: str):
+    """
+    Fetches the dataset zip from the local stand-in server and extracts it.
+    Each file is written to a temporary name and renamed into place, so
+    concurrent refreshes never expose a half-written CSV.
+    """
+    url = f"{KAGGLE_LOCAL_URL}/datasets/{dataset_id}/download"
+    with urllib.request.urlopen(url, timeout=KAGGLE_LOCAL_TIMEOUT) as response:
+        archive = io.BytesIO(response.read())
+
+    with zipfile.ZipFile(archive) as zf:
+        for name in zf.namelist():
+            target = os.path.join(RAW_DATA_DIR, os.path.basename(name))
+            fd, tmp_path = tempfile.mkstemp(dir=RAW_DATA_DIR, suffix=".part")
+            with os.fdopen(fd, "wb") as out:
+                out.write(zf.read(name))
+            # mkstemp creates the file 0600; keep the mode of the file being replaced
+            os.chmod(tmp_path, os.stat(target).st_mode & 0o777 if os.path.exists(target) else 0o644)
+            os.replace(tmp_path, target)
+
 def download_kaggle_dataset(dataset_id: str):
     """
     Downloads a dataset from Kaggle and extracts it.
@@ -15,8 +48,25 @@ def download_kaggle_dataset(dataset_id: str):
     Returns:
         str: The path to the directory where files were extracted.
     """
+    if KAGGLE_BACKEND == "stub":
+        print(f"Stub download of dataset: {dataset_id}...")
+        time.sleep(KAGGLE_STUB_LATENCY)
+        return RAW_DATA_DIR
+
+    if KAGGLE_BACKEND == "local":
+        print(f"Downloading dataset from local server: {dataset_id}...")
+        try:
+            _download_from_local_server(dataset_id)
+            return RAW_DATA_DIR
+        except Exception as e:
+            print(f"Error downloading dataset from local server: {e}")
+            return None
+
     print(f"Downloading dataset: {dataset_id}...")
     try:
+        # Imported here because the kaggle package authenticates on import
+        import kaggle
+
         # Authenticate and download the dataset
         kaggle.api.authenticate()
         kaggle.api.dataset_download_files(dataset_id, path=RAW_DATA_DIR, unzip=True)
@@ -25,4 +75,4 @@ def download_kaggle_dataset(dataset_id: str):
     except Exception as e:
         print(f"Error downloading dataset from Kaggle: {e}")
         print("Please ensure your kaggle.json API token is set up correctly.")
-        return None
\ No newline at end of file
+        return None
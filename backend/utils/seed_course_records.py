@@ -0,0 +1,84 @@
+"""
+Generates the seed course records shipped in data/raw/course_records.csv.
+
+    python -m utils.seed_course_records [--seed 7] [--weeks 12]
+
+The Kaggle dataset has one row of scores per student and no course activity,
+so the trend charts, cohort curves and the weekly trend in the AI summary have
+nothing to roll up until real course records are posted to /api/course-records.
+This writes a deterministic term of activity for the students in the cleaned
+dataset: each student takes a few courses and submits attempts over some
+consecutive weeks, scoring around their own overall score. Re-run it after a
+refresh adds students.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from services.data_cleaning import load_cleaned_data, SCORE_COLUMNS, COMPLETION_THRESHOLD
+from services.course_analytics import COURSE_RECORDS_PATH
+
+# course_id, course_name, score offset against the student's overall score
+COURSES = [
+    ("course_1", "Intro to AI", 2.0),
+    ("course_2", "Data Analysis with Python", 0.0),
+    ("course_3", "Statistics Fundamentals", -4.0),
+    ("course_4", "Machine Learning", -8.0),
+    ("course_5", "Academic Writing", 4.0),
+    ("course_6", "Research Methods", -2.0),
+]
+TERM_START = pd.Timestamp("2024-01-08", tz="UTC")  # a Monday
+TERM_WEEKS = 12
+COURSES_PER_STUDENT = (1, 3)
+ATTEMPTS_PER_COURSE = (1, 6)
+SCORE_NOISE = 8.0
+WEEKLY_IMPROVEMENT = 1.5
+
+
+def generate_course_records(students, seed=7, weeks=TERM_WEEKS):
+    """
+    students: cleaned student rows (student_id plus the score columns).
+    Returns one row per attempt: course_id, course_name, student_id, score,
+    completion and an ISO 8601 UTC timestamp.
+    """
+    rng = np.random.default_rng(seed)
+    overall = students[SCORE_COLUMNS].mean(axis=1).to_numpy()
+
+    rows = []
+    for student_id, base_score in zip(students['student_id'], overall):
+        n_courses = rng.integers(COURSES_PER_STUDENT[0], COURSES_PER_STUDENT[1] + 1)
+        for course in rng.choice(len(COURSES), size=n_courses, replace=False):
+            course_id, course_name, offset = COURSES[course]
+            start_week = rng.integers(0, weeks // 2)
+            attempts = min(rng.integers(ATTEMPTS_PER_COURSE[0], ATTEMPTS_PER_COURSE[1] + 1), weeks - start_week)
+            for attempt in range(attempts):
+                score = base_score + offset + attempt * WEEKLY_IMPROVEMENT + rng.normal(0, SCORE_NOISE)
+                score = round(float(np.clip(score, 0, 100)), 1)
+                timestamp = TERM_START + pd.Timedelta(
+                    days=int((start_week + attempt) * 7 + rng.integers(0, 7)),
+                    minutes=int(rng.integers(8 * 60, 22 * 60)),
+                )
+                rows.append((course_id, course_name, student_id, score,
+                             score >= COMPLETION_THRESHOLD, timestamp.strftime("%Y-%m-%dT%H:%M:%SZ")))
+
+    records = pd.DataFrame(rows, columns=['course_id', 'course_name', 'student_id', 'score', 'completion', 'timestamp'])
+    return records.sort_values(['timestamp', 'course_id', 'student_id'], kind='stable').reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write seed course records for the cleaned students.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--weeks", type=int, default=TERM_WEEKS)
+    parser.add_argument("--output", default=COURSE_RECORDS_PATH)
+    args = parser.parse_args()
+
+    students = load_cleaned_data()
+    if students is None:
+        raise SystemExit("No cleaned dataset found; run a refresh first.")
+
+    records = generate_course_records(students, seed=args.seed, weeks=args.weeks)
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    records.to_csv(args.output, index=False)
+    print(f"Wrote {len(records)} course records for {records['student_id'].nunique()} students to {args.output}")
@@ -226,6 +226,28 @@ async function getDropoutsData() {
     }
 }
 
+// Fetches several panels (dashboard, scores, trends, dropouts) in one request
+async function getDashboardViews(views) {
+    clearError();
+    showLoading();
+    try {
+        const params = new URLSearchParams(getFilterParams());
+        params.set('views', views.join(','));
+        const response = await fetch(`${API_BASE_URL}/dashboard-views?${params.toString()}`);
+        if (!response.ok) {
+            const errorData = await response.json();
+            throw new Error(errorData.error || `Backend responded with status ${response.status}`);
+        }
+        const data = await response.json();
+        return data;
+    } catch (error) {
+        showError(`Failed to fetch dashboard views: ${error.message}`);
+        throw error;
+    } finally {
+        hideLoading();
+    }
+}
+
 async function getLearningInsights(studentData) {
     try {
         const response = await fetch(`${API_BASE_URL}/ai-summary${getFilterParams()}`, {
@@ -249,7 +271,61 @@ async function getLearningInsights(studentData) {
     }
 }
 
+// What-if grid from /predict-grid: every prediction is a local interpolation
+// instead of a request. The grid is revalidated with its ETag (If-None-Match)
+// once it is older than PREDICTION_GRID_MAX_AGE_MS, so a retrained model is
+// picked up without re-downloading an unchanged grid.
+const PREDICTION_GRID_MAX_AGE_MS = 60 * 1000;
+let predictionGrid = null;
+let predictionGridEtag = null;
+let predictionGridCheckedAt = 0;
+
+async function getPredictionGrid() {
+    if (predictionGrid && Date.now() - predictionGridCheckedAt < PREDICTION_GRID_MAX_AGE_MS) {
+        return predictionGrid;
+    }
+
+    const headers = predictionGrid && predictionGridEtag ? { 'If-None-Match': predictionGridEtag } : {};
+    const response = await fetch(`${API_BASE_URL}/predict-grid`, { headers, cache: 'no-store' });
+    if (response.status === 304 && predictionGrid) {
+        predictionGridCheckedAt = Date.now();
+        return predictionGrid;
+    }
+    if (!response.ok) {
+        predictionGrid = null;  // fall back to /predict until the grid is available again
+        throw new Error(`Backend responded with status ${response.status}`);
+    }
+    predictionGrid = await response.json();
+    predictionGridEtag = response.headers.get('ETag');
+    predictionGridCheckedAt = Date.now();
+    return predictionGrid;
+}
+
+function interpolateLikelihood(grid, score) {
+    // The backend marks grids of models too steep to interpolate; use /predict
+    if (!grid.interpolate) return null;
+    const row = grid.grid.find(entry => grid.features.every(feature => entry[feature] === grid.defaults[feature]));
+    if (!row) return null;
+
+    const scores = grid.scores;
+    const values = row.completion_likelihood;
+    if (score <= scores[0]) return values[0];
+    if (score >= scores[scores.length - 1]) return values[values.length - 1];
+
+    const step = scores[1] - scores[0];
+    const i = Math.min(Math.floor((score - scores[0]) / step), scores.length - 2);
+    const t = (score - scores[i]) / step;
+    return values[i] + t * (values[i + 1] - values[i]);
+}
+
 async function predictCompletion(hoursWatched, averageScore, daysActive) {
+    try {
+        const likelihood = interpolateLikelihood(await getPredictionGrid(), averageScore);
+        if (likelihood !== null) return likelihood;
+    } catch (error) {
+        console.warn("Prediction grid unavailable, falling back to /predict:", error);
+    }
+
     try {
         const response = await fetch(`${API_BASE_URL}/predict${getFilterParams()}`, {
             method: 'POST',
@@ -329,18 +405,27 @@ function renderTrendsCharts(data) {
     // Learning Completion Trend (chart-completion)
     if (chartCompletionElem && data.completionTrend) {
         const trace = {
-            x: data.completionTrend.map(item => item.parental_level_of_education),
+            x: data.completionTrend.map(item => item.period),
             y: data.completionTrend.map(item => item.completion_rate),
-            type: 'bar',
+            type: 'scatter',
+            mode: 'lines+markers',
             marker: { color: '#4F46E5' },
             name: 'Completion Rate'
         };
+        const rollingTrace = {
+            x: data.completionTrend.map(item => item.period),
+            y: data.completionTrend.map(item => item.rolling_completion_rate),
+            type: 'scatter',
+            mode: 'lines',
+            line: { color: '#A5B4FC', dash: 'dot' },
+            name: 'Rolling Average'
+        };
         const layout = {
-            title: 'Completion Rate by Parental Education Level',
-            xaxis: { title: 'Parental Education Level' },
+            title: 'Completion Rate Over Time',
+            xaxis: { title: 'Week' },
             yaxis: { title: 'Completion Rate (%)' }
         };
-        Plotly.newPlot(chartCompletionElem, [trace], layout);
+        Plotly.newPlot(chartCompletionElem, [trace, rollingTrace], layout);
     }
 
     // Average Scores (chart-scores)
@@ -441,6 +526,28 @@ async function fetchDataAndRender() {
     }
 }
 
+// Re-renders the overview and the active page's charts from a single /dashboard-views call
+async function fetchViewsAndRender() {
+    const activeNavButton = document.querySelector('.nav-btn.active');
+    const pageType = activeNavButton ? activeNavButton.dataset.target : null;
+    const views = ['dashboard'];
+    if (['trends', 'scores', 'dropouts'].includes(pageType)) views.push(pageType);
+
+    try {
+        const data = await getDashboardViews(views);
+        renderStats(data.dashboard.stats);
+        currentStudentData = data.dashboard.studentData; // Store for AI insights
+        if (data.trends) renderTrendsCharts(data.trends);
+        if (data.scores) renderScoresCharts(data.scores);
+        if (data.dropouts) renderDropoutsCharts(data.dropouts);
+
+        const insights = await getLearningInsights(currentStudentData);
+        renderAiInsights(insights);
+    } catch (error) {
+        console.error("Dashboard rendering failed:", error);
+    }
+}
+
 // --- Event Listeners ---
 const navButtons = document.querySelectorAll('.nav-btn');
 const pages = document.querySelectorAll('.page');
@@ -678,20 +785,8 @@ function applyFilters() {
         lunch: filterLunch.value,
         test_preparation_course: filterTestPrep.value
     };
-    // Re-fetch and re-render data with new filters
-    fetchDataAndRender();
-    // Also re-render the current active page's charts
-    const activeNavButton = document.querySelector('.nav-btn.active');
-    if (activeNavButton) {
-        const pageType = activeNavButton.dataset.target;
-        if (pageType === 'trends') {
-            getTrendsData().then(renderTrendsCharts);
-        } else if (pageType === 'scores') {
-            getScoresData().then(renderScoresCharts);
-        } else if (pageType === 'dropouts') {
-            getDropoutsData().then(renderDropoutsCharts);
-        }
-    }
+    // Re-fetch and re-render the overview and the active page's charts with new filters
+    fetchViewsAndRender();
 }
 
 // Function to clear filters
@@ -702,20 +797,8 @@ function clearFilters() {
     filterLunch.value = '';
     filterTestPrep.value = '';
     currentFilters = {}; // Clear stored filters
-    // Re-fetch and re-render data without filters
-    fetchDataAndRender();
-    // Also re-render the current active page's charts
-    const activeNavButton = document.querySelector('.nav-btn.active');
-    if (activeNavButton) {
-        const pageType = activeNavButton.dataset.target;
-        if (pageType === 'trends') {
-            getTrendsData().then(renderTrendsCharts);
-        } else if (pageType === 'scores') {
-            getScoresData().then(renderScoresCharts);
-        } else if (pageType === 'dropouts') {
-            getDropoutsData().then(renderDropoutsCharts);
-        }
-    }
+    // Re-fetch and re-render the overview and the active page's charts without filters
+    fetchViewsAndRender();
 }
 
 // Function to show metric details in the modal